@@ -0,0 +1,233 @@
+# ann_index.py
+import os
+import numpy as np
+
+from face_gallery import UNKNOWN_LABEL, l2_normalize
+
+
+class IVFIndex:
+    """Index ANN gaya IVF (coarse quantizer k-means + probing) murni NumPy
+
+    Embedding disimpan ternormalisasi; tiap vektor dimasukkan ke list centroid
+    terdekat. Query hanya dibandingkan dengan isi `nprobe` list terdekat, jadi
+    nprobe mengatur trade-off recall vs latency.
+    """
+
+    def __init__(self, nlist=256, nprobe=8, train_iters=10, dim=512):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iters = train_iters
+        self.dim = dim
+
+        self.centroids = None
+        self.trained_size = 0
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.labels = np.empty(0, dtype=object)
+        self.assign = np.empty(0, dtype=np.int32)  # list id per row, -1 jika sudah dihapus
+        self.size = 0
+
+        # Inverted list dibangun ulang secara lazy setelah add/remove
+        self._list_order = None
+        self._list_bounds = None
+        self._list_vectors = None
+
+    def __len__(self):
+        return int(np.count_nonzero(self.assign[:self.size] >= 0))
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def train(self, embeddings=None, seed=0):
+        """Melatih coarse quantizer dengan spherical k-means"""
+        if embeddings is None:
+            embeddings = self.vectors[:self.size][self.assign[:self.size] >= 0]
+        data = l2_normalize(embeddings)
+
+        nlist = min(self.nlist, len(data))
+        if nlist == 0:
+            return False
+
+        rng = np.random.default_rng(seed)
+        # Sampling agar training tetap cepat pada galeri besar
+        max_samples = 256 * nlist
+        if len(data) > max_samples:
+            data = data[rng.choice(len(data), max_samples, replace=False)]
+
+        centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+        for _ in range(self.train_iters):
+            nearest = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, nearest, data)
+            counts = np.bincount(nearest, minlength=nlist)
+
+            # Centroid kosong diisi ulang dengan titik acak
+            empty = counts == 0
+            sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+            centroids = l2_normalize(sums)
+
+        self.use_centroids(centroids)
+        return True
+
+    def use_centroids(self, centroids, trained_size=None):
+        """Memakai centroid yang sudah ada (mis. dari index tersimpan) tanpa training ulang"""
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.trained_size = self.size if trained_size is None else trained_size
+
+        # Assign ulang semua vektor yang masih aktif ke centroid baru
+        alive = self.assign[:self.size] >= 0
+        if alive.any():
+            self.assign[:self.size][alive] = self._nearest_list(self.vectors[:self.size][alive])
+        self._invalidate()
+
+    def add(self, embeddings, labels):
+        """Menambahkan embedding baru (enrol) ke index"""
+        embeddings = l2_normalize(embeddings)
+        labels = np.asarray(labels, dtype=object)
+        if len(embeddings) != len(labels):
+            raise ValueError("Jumlah embedding dan label tidak sama")
+
+        self._reserve(self.size + len(embeddings))
+        start, end = self.size, self.size + len(embeddings)
+        self.vectors[start:end] = embeddings
+        self.labels[start:end] = labels
+        self.assign[start:end] = self._nearest_list(embeddings) if self.is_trained else 0
+        self.size = end
+        self._invalidate()
+
+        # Galeri tumbuh jauh melebihi saat training: latih ulang agar list tetap seimbang
+        if self.is_trained and len(self.centroids) < self.nlist and self.size >= 4 * max(self.trained_size, 1):
+            self.train()
+        return np.arange(start, end)
+
+    def remove(self, label):
+        """Menghapus semua embedding milik label (mis. orang yang keluar dari sistem)"""
+        rows = np.flatnonzero((self.labels[:self.size] == label) & (self.assign[:self.size] >= 0))
+        self.assign[rows] = -1
+        if len(rows):
+            self._invalidate()
+        return len(rows)
+
+    def compact(self):
+        """Membuang row yang sudah dihapus dari storage"""
+        alive = self.assign[:self.size] >= 0
+        self.vectors = np.ascontiguousarray(self.vectors[:self.size][alive])
+        self.labels = self.labels[:self.size][alive]
+        self.assign = self.assign[:self.size][alive]
+        self.size = len(self.assign)
+        self._invalidate()
+
+    def match(self, embeddings, threshold=0.5, top_k=1):
+        """Sama dengan FaceGallery.match, tetapi hanya memeriksa nprobe list terdekat"""
+        if len(embeddings) == 0:
+            return []
+        queries = l2_normalize(embeddings)
+        if len(self) == 0:
+            return [[(UNKNOWN_LABEL, 0.0)] for _ in range(len(queries))]
+
+        # Belum dilatih: fallback ke pencarian exact
+        if not self.is_trained:
+            alive = np.flatnonzero(self.assign[:self.size] >= 0)
+            return [self._rank_candidates(q, alive, threshold, top_k) for q in queries]
+
+        order, bounds, list_vectors = self._inverted_lists()
+        nprobe = min(self.nprobe, len(self.centroids))
+        coarse = queries @ self.centroids.T
+        probes = np.argpartition(-coarse, nprobe - 1, axis=1)[:, :nprobe]
+
+        results = []
+        for query, probe in zip(queries, probes):
+            # Isi tiap list tersimpan contiguous, jadi cukup slicing tanpa gather
+            candidates = np.concatenate([order[bounds[p]:bounds[p + 1]] for p in probe])
+            scores = np.concatenate([list_vectors[bounds[p]:bounds[p + 1]] @ query for p in probe])
+            results.append(self._rank_scores(candidates, scores, threshold, top_k))
+        return results
+
+    def identify(self, embedding, threshold=0.5):
+        """Mengenali satu embedding, mengembalikan (label, similarity)"""
+        return self.match([embedding], threshold, top_k=1)[0][0]
+
+    def save(self, path):
+        """Menyimpan index ke file .npz secara atomik"""
+        self.compact()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                centroids=self.centroids if self.is_trained else np.empty((0, self.dim), np.float32),
+                vectors=self.vectors,
+                labels=self.labels.astype(str),
+                assign=self.assign,
+                params=np.array([self.nlist, self.nprobe, self.train_iters, self.dim])
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memuat index dari file .npz"""
+        with np.load(path, allow_pickle=False) as data:
+            nlist, nprobe, train_iters, dim = (int(v) for v in data['params'])
+            index = cls(nlist=nlist, nprobe=nprobe, train_iters=train_iters, dim=dim)
+            index.vectors = np.ascontiguousarray(data['vectors'], dtype=np.float32)
+            index.labels = data['labels'].astype(object)
+            index.assign = data['assign'].astype(np.int32)
+            index.size = len(index.assign)
+            if len(data['centroids']):
+                index.centroids = np.ascontiguousarray(data['centroids'], dtype=np.float32)
+                index.trained_size = index.size
+        return index
+
+    def _rank_candidates(self, query, candidates, threshold, top_k):
+        """Skor exact untuk sekumpulan row kandidat"""
+        return self._rank_scores(candidates, self.vectors[candidates] @ query, threshold, top_k)
+
+    def _rank_scores(self, candidates, scores, threshold, top_k):
+        """Mengambil top_k dari skor kandidat"""
+        if len(candidates) == 0:
+            return [(UNKNOWN_LABEL, 0.0)]
+
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (self.labels[candidates[i]] if scores[i] >= threshold else UNKNOWN_LABEL, float(scores[i]))
+            for i in top
+        ]
+
+    def _nearest_list(self, embeddings):
+        return np.argmax(embeddings @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _reserve(self, capacity):
+        """Memperbesar storage secara geometris agar add tetap amortized O(1)"""
+        if capacity <= len(self.assign):
+            return
+        new_capacity = max(capacity, 2 * len(self.assign), 64)
+
+        vectors = np.empty((new_capacity, self.dim), dtype=np.float32)
+        vectors[:self.size] = self.vectors[:self.size]
+        labels = np.empty(new_capacity, dtype=object)
+        labels[:self.size] = self.labels[:self.size]
+        assign = np.full(new_capacity, -1, dtype=np.int32)
+        assign[:self.size] = self.assign[:self.size]
+
+        self.vectors, self.labels, self.assign = vectors, labels, assign
+
+    def _invalidate(self):
+        self._list_order = None
+        self._list_bounds = None
+        self._list_vectors = None
+
+    def _inverted_lists(self):
+        """Row id terurut per list, batas tiap list dan salinan vektor per list (dibangun lazy)"""
+        if self._list_order is None:
+            assign = self.assign[:self.size]
+            order = np.argsort(assign, kind='stable')
+            # Row terhapus (-1) ada di awal dan tidak termasuk list mana pun
+            bounds = np.searchsorted(assign[order], np.arange(len(self.centroids) + 1))
+            self._list_order, self._list_bounds = order, bounds
+            self._list_vectors = np.ascontiguousarray(self.vectors[order])
+        return self._list_order, self._list_bounds, self._list_vectors
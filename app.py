@@ -1,99 +1,255 @@
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, render_template, jsonify, request, send_from_directory, send_file, make_response, Response, stream_with_context
 import mysql.connector
 from datetime import datetime, timedelta
+import base64
+import hashlib
+import queue
 import json
 import os
 import sys
+import threading
+import time
+from functools import wraps
+from jinja2 import TemplateNotFound
+from werkzeug.security import safe_join
 
 # Tambahkan path untuk import config
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BASE_DIR)
 
-from config import DB_CONFIG
+from config import WEB_SETTINGS, WEB_SERVER_SETTINGS
+from db_pool import get_pool
+from rollups import fetch_today_stats, fetch_unique_faces, fetch_top_persons, fetch_hour_counts
+from response_cache import ResponseCache, DataVersion
+from live_events import LiveEventBroadcaster
+from log_export import EXPORT_FORMATS, parse_export_filters, iter_log_chunks, csv_stream, ndjson_stream, write_parquet, parquet_available
 
-app = Flask(__name__)
+# Template HTML ada di root project. Jinja loader Flask meng-compile tiap template
+# sekali lalu menyimpannya di cache; template hanya dicek ulang di disk saat debug
+# (TEMPLATES_AUTO_RELOAD mengikuti app.debug). File static dilayani serve_static.
+app = Flask(__name__, template_folder=BASE_DIR, static_folder=None)
 
 def get_db_connection():
-    """Membuat koneksi ke database MySQL"""
+    """Mengambil koneksi dari pool bersama (kembalikan dengan release_db_connection)"""
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
+        return get_pool().acquire()
     except mysql.connector.Error as e:
         print(f"[DATABASE ERROR] Gagal terkoneksi ke database: {e}")
         return None
 
+def release_db_connection(conn, failed=False):
+    """Mengembalikan koneksi ke pool; koneksi yang putus setelah error dibuang"""
+    get_pool().release(conn, discard=failed and not conn.is_connected())
+
+def fetch_data_version():
+    """Versi data dari tabel data_version (dinaikkan DatabaseHandler setiap ada log baru)"""
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT version FROM data_version WHERE id = 1")
+        row = cursor.fetchone()
+        cursor.close()
+    return row[0] if row else 0
+
+response_cache = ResponseCache()
+data_version = DataVersion(fetch_data_version)
+live_events = LiveEventBroadcaster()
+
+def cached_api(view):
+    """Cache response JSON per URL sampai data berubah, dengan ETag / 304 Not Modified"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = data_version.current()
+        key = request.full_path
+        
+        cached = response_cache.get(key, version)
+        if cached is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            etag = response_cache.put(key, version, body)
+        else:
+            body, etag = cached
+        
+        if request.if_none_match.contains(etag.strip('"')):
+            response = make_response('', 304)
+        else:
+            response = make_response(body)
+            response.mimetype = 'application/json'
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
 def render_html(filename, **kwargs):
-    """Render HTML file directly from root directory"""
+    """Render template HTML dari root directory (compiled template di-cache Jinja)"""
     try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-        from flask import render_template_string
-        return render_template_string(html_content, **kwargs)
-    except FileNotFoundError:
+        return render_template(filename, **kwargs)
+    except TemplateNotFound:
         return f"File {filename} tidak ditemukan", 404
     except Exception as e:
         return f"Error rendering template: {str(e)}", 500
 
+_asset_versions = {}
+_asset_lock = threading.Lock()
+
+def asset_version(filename):
+    """Hash isi file static (dihitung ulang hanya jika mtime/ukuran berubah)"""
+    path = os.path.join(BASE_DIR, filename)
+    stat = os.stat(path)
+    with _asset_lock:
+        cached = _asset_versions.get(filename)
+        if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            return cached[1]
+    with open(path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:10]
+    with _asset_lock:
+        _asset_versions[filename] = ((stat.st_mtime_ns, stat.st_size), digest)
+    return digest
+
+@app.template_global()
+def asset_url(filename):
+    """URL file static dengan versi hash isi: {{ asset_url('style.css') }}"""
+    return f"/{filename}?v={asset_version(filename)}"
+
 # Route untuk file static (CSS, JS, images)
 @app.route('/<path:filename>')
 def serve_static(filename):
-    """Serve static files directly"""
-    if os.path.isfile(filename):
-        return send_from_directory('.', filename)
-    return "File not found", 404
+    """Serve static files directly
+
+    URL dengan ?v=<hash> yang cocok di-cache browser selamanya (immutable);
+    tanpa versi di-cache sebentar dan divalidasi ulang lewat ETag.
+    """
+    path = safe_join(BASE_DIR, filename)
+    if path is None or not os.path.isfile(path) or os.path.splitext(filename)[1].lower() not in WEB_SETTINGS['static_extensions']:
+        return "File not found", 404
+    
+    versioned = request.args.get('v') == asset_version(filename)
+    max_age = WEB_SETTINGS['static_max_age_versioned'] if versioned else WEB_SETTINGS['static_max_age']
+    response = send_from_directory(BASE_DIR, filename, max_age=max_age)
+    response.cache_control.public = True
+    if versioned:
+        response.cache_control.immutable = True
+    return response
 
 @app.route('/')
 def index():
     """Halaman dashboard utama"""
     return render_html('index.html')
 
+def encode_cursor(waktu, log_id, direction):
+    """Token halaman opaque dari posisi (waktu, id) baris batas"""
+    raw = json.dumps({'w': waktu.isoformat(), 'i': log_id, 'd': direction})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """Mengembalikan (waktu, id, direction), atau None jika token tidak valid"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        data = json.loads(raw)
+        direction = data['d'] if data['d'] in ('next', 'prev') else 'next'
+        return datetime.fromisoformat(data['w']), int(data['i']), direction
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def fetch_logs_page(cursor, token=None, limit=20):
+    """Keyset pagination pada (waktu, id): biaya halaman ke-N sama dengan halaman pertama
+
+    Mengembalikan (logs, next_cursor, prev_cursor). Memakai index idx_waktu (InnoDB menyertakan id di index sekunder).
+    """
+    position = decode_cursor(token) if token else None
+    
+    if position is None:
+        cursor.execute("""
+            SELECT * FROM logs 
+            ORDER BY waktu DESC, id DESC 
+            LIMIT %s
+        """, (limit + 1,))
+        rows = cursor.fetchall()
+        has_older, has_newer = len(rows) > limit, False
+    else:
+        waktu, log_id, direction = position
+        if direction == 'next':
+            cursor.execute("""
+                SELECT * FROM logs 
+                WHERE waktu < %s OR (waktu = %s AND id < %s)
+                ORDER BY waktu DESC, id DESC 
+                LIMIT %s
+            """, (waktu, waktu, log_id, limit + 1))
+            rows = cursor.fetchall()
+            has_older, has_newer = len(rows) > limit, True
+        else:
+            cursor.execute("""
+                SELECT * FROM logs 
+                WHERE waktu > %s OR (waktu = %s AND id > %s)
+                ORDER BY waktu ASC, id ASC 
+                LIMIT %s
+            """, (waktu, waktu, log_id, limit + 1))
+            rows = cursor.fetchall()
+            has_older, has_newer = True, len(rows) > limit
+            rows = rows[:limit][::-1]
+    
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1]['waktu'], rows[-1]['id'], 'next') if rows and has_older else None
+    prev_cursor = encode_cursor(rows[0]['waktu'], rows[0]['id'], 'prev') if rows and has_newer else None
+    return rows, next_cursor, prev_cursor
+
+_total_logs_cache = {'value': 0, 'expires': 0.0}
+_total_logs_lock = threading.Lock()
+
+def cached_total_logs(cursor):
+    """Total log dari SUM rollup_daily (satu baris per hari), di-cache count_cache_ttl detik"""
+    with _total_logs_lock:
+        if time.time() < _total_logs_cache['expires']:
+            return _total_logs_cache['value']
+    
+    cursor.execute("SELECT COALESCE(SUM(total), 0) AS total FROM rollup_daily")
+    total = int(cursor.fetchone()['total'])
+    with _total_logs_lock:
+        _total_logs_cache.update(value=total, expires=time.time() + WEB_SETTINGS['count_cache_ttl'])
+    return total
+
+def format_log_times(logs_data):
+    """Convert datetime objects to strings"""
+    for log in logs_data:
+        if isinstance(log['waktu'], datetime):
+            log['waktu'] = log['waktu'].strftime('%Y-%m-%d %H:%M:%S')
+        if isinstance(log.get('created_at'), datetime):
+            log['created_at'] = log['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+    return logs_data
+
 @app.route('/logs')
 def logs():
-    """Halaman menampilkan semua logs"""
-    page = request.args.get('page', 1, type=int)
-    per_page = 20
-    offset = (page - 1) * per_page
+    """Halaman menampilkan semua logs (keyset pagination, ?cursor=<token>)"""
+    token = request.args.get('cursor')
     
     conn = get_db_connection()
     if conn is None:
         return render_html('error.html', message="Koneksi database gagal"), 500
     
+    failed = False
     try:
         cursor = conn.cursor(dictionary=True)
         
-        # Get total count
-        cursor.execute("SELECT COUNT(*) as total FROM logs")
-        total = cursor.fetchone()['total']
-        
-        # Get logs dengan pagination
-        cursor.execute("""
-            SELECT * FROM logs 
-            ORDER BY waktu DESC 
-            LIMIT %s OFFSET %s
-        """, (per_page, offset))
-        
-        logs_data = cursor.fetchall()
-        
-        # Convert datetime objects to strings
-        for log in logs_data:
-            if isinstance(log['waktu'], datetime):
-                log['waktu'] = log['waktu'].strftime('%Y-%m-%d %H:%M:%S')
-            if isinstance(log.get('created_at'), datetime):
-                log['created_at'] = log['created_at'].strftime('%Y-%m-%d %H:%M:%S')
-        
-        total_pages = (total + per_page - 1) // per_page
+        total = cached_total_logs(cursor)
+        logs_data, next_cursor, prev_cursor = fetch_logs_page(cursor, token, WEB_SETTINGS['logs_per_page'])
+        format_log_times(logs_data)
         
         cursor.close()
-        conn.close()
         
         return render_html('logs.html', 
                          logs=logs_data, 
-                         page=page, 
-                         total_pages=total_pages,
+                         next_cursor=next_cursor,
+                         prev_cursor=prev_cursor,
                          total=total)
     
     except mysql.connector.Error as e:
+        failed = True
         print(f"[DATABASE ERROR] {e}")
         return render_html('error.html', message="Terjadi kesalahan database"), 500
+    
+    finally:
+        release_db_connection(conn, failed)
 
 @app.route('/statistics')
 def statistics():
@@ -102,6 +258,7 @@ def statistics():
     if conn is None:
         return render_html('error.html', message="Koneksi database gagal"), 500
     
+    failed = False
     try:
         cursor = conn.cursor(dictionary=True)
         
@@ -109,62 +266,22 @@ def statistics():
         cursor.execute("SELECT * FROM statistics ORDER BY last_updated DESC LIMIT 1")
         stats = cursor.fetchone()
         
-        # Get today's activity
+        # Aktivitas hari ini, wajah unik, top persons dan per jam dibaca dari tabel rollup
         today = datetime.now().date()
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_activities,
-                SUM(CASE WHEN status_masuk_keluar = 'masuk' THEN 1 ELSE 0 END) as masuk_today,
-                SUM(CASE WHEN status_masuk_keluar = 'keluar' THEN 1 ELSE 0 END) as keluar_today
-            FROM logs 
-            WHERE DATE(waktu) = %s
-        """, (today,))
-        today_stats = cursor.fetchone()
-        
-        # Get unique faces today
-        cursor.execute("""
-            SELECT COUNT(DISTINCT consistent_id) as unique_faces_today
-            FROM logs 
-            WHERE DATE(waktu) = %s AND consistent_id IS NOT NULL
-        """, (today,))
-        unique_today = cursor.fetchone()
-        
-        # Get top active persons
-        cursor.execute("""
-            SELECT 
-                nim_nama,
-                COUNT(*) as activity_count,
-                SUM(CASE WHEN status_masuk_keluar = 'masuk' THEN 1 ELSE 0 END) as masuk_count,
-                SUM(CASE WHEN status_masuk_keluar = 'keluar' THEN 1 ELSE 0 END) as keluar_count
-            FROM logs 
-            WHERE nim_nama != 'Tidak Dikenali' AND nim_nama IS NOT NULL
-            GROUP BY nim_nama 
-            ORDER BY activity_count DESC 
-            LIMIT 10
-        """)
-        top_persons = cursor.fetchall()
-        
-        # Get activity by hour for today
-        cursor.execute("""
-            SELECT 
-                HOUR(waktu) as hour,
-                COUNT(*) as count
-            FROM logs 
-            WHERE DATE(waktu) = %s
-            GROUP BY HOUR(waktu)
-            ORDER BY hour
-        """, (today,))
-        hourly_data = cursor.fetchall()
+        daily = fetch_today_stats(cursor, today)
+        today_stats = {
+            'total_activities': daily['total'],
+            'masuk_today': daily['masuk'],
+            'keluar_today': daily['keluar']
+        }
+        unique_today = fetch_unique_faces(cursor, today)
+        top_persons = fetch_top_persons(cursor, 10)
         
         # Create hourly chart data
         hours = list(range(24))
-        hour_counts = [0] * 24
-        for data in hourly_data:
-            if 0 <= data['hour'] < 24:
-                hour_counts[data['hour']] = data['count']
+        hour_counts = fetch_hour_counts(cursor, today)
         
         cursor.close()
-        conn.close()
         
         return render_html('statistics.html',
                          stats=stats,
@@ -175,18 +292,24 @@ def statistics():
                          hour_counts=hour_counts)
     
     except mysql.connector.Error as e:
+        failed = True
         print(f"[DATABASE ERROR] {e}")
         return render_html('error.html', message="Terjadi kesalahan database"), 500
+    
+    finally:
+        release_db_connection(conn, failed)
 
 # ========== API ROUTES FOR AJAX ==========
 
 @app.route('/api/dashboard_data')
+@cached_api
 def api_dashboard_data():
     """API untuk data dashboard"""
     conn = get_db_connection()
     if conn is None:
         return jsonify({"error": "Database connection failed"}), 500
     
+    failed = False
     try:
         cursor = conn.cursor(dictionary=True)
         
@@ -194,17 +317,14 @@ def api_dashboard_data():
         cursor.execute("SELECT * FROM statistics ORDER BY last_updated DESC LIMIT 1")
         stats = cursor.fetchone()
         
-        # Get today's activity
+        # Get today's activity (rollup harian)
         today = datetime.now().date()
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_today,
-                SUM(CASE WHEN status_masuk_keluar = 'masuk' THEN 1 ELSE 0 END) as masuk_today,
-                SUM(CASE WHEN status_masuk_keluar = 'keluar' THEN 1 ELSE 0 END) as keluar_today
-            FROM logs 
-            WHERE DATE(waktu) = %s
-        """, (today,))
-        today_stats = cursor.fetchone()
+        daily = fetch_today_stats(cursor, today)
+        today_stats = {
+            'total_today': daily['total'],
+            'masuk_today': daily['masuk'],
+            'keluar_today': daily['keluar']
+        }
         
         # Get recent activity
         cursor.execute("SELECT * FROM logs ORDER BY waktu DESC LIMIT 5")
@@ -216,7 +336,6 @@ def api_dashboard_data():
                 activity['waktu'] = activity['waktu'].strftime('%H:%M:%S')
         
         cursor.close()
-        conn.close()
         
         return jsonify({
             'statistics': stats,
@@ -225,16 +344,22 @@ def api_dashboard_data():
         })
     
     except mysql.connector.Error as e:
+        failed = True
         print(f"[DATABASE ERROR] {e}")
         return jsonify({"error": "Database error"}), 500
+    
+    finally:
+        release_db_connection(conn, failed)
 
 @app.route('/api/recent_activity')
+@cached_api
 def api_recent_activity():
     """API untuk aktivitas terkini"""
     conn = get_db_connection()
     if conn is None:
         return jsonify({"error": "Database connection failed"}), 500
     
+    failed = False
     try:
         cursor = conn.cursor(dictionary=True)
         
@@ -251,13 +376,145 @@ def api_recent_activity():
                 activity['waktu'] = activity['waktu'].strftime('%Y-%m-%d %H:%M:%S')
         
         cursor.close()
-        conn.close()
         
         return jsonify(recent_activity)
     
     except mysql.connector.Error as e:
+        failed = True
+        print(f"[DATABASE ERROR] {e}")
+        return jsonify({"error": "Database error"}), 500
+    
+    finally:
+        release_db_connection(conn, failed)
+
+@app.route('/api/logs')
+@cached_api
+def api_logs():
+    """API logs untuk infinite scroll: ?cursor=<next_cursor>&limit=N"""
+    token = request.args.get('cursor')
+    limit = min(max(request.args.get('limit', WEB_SETTINGS['logs_per_page'], type=int), 1),
+                WEB_SETTINGS['logs_max_limit'])
+    
+    conn = get_db_connection()
+    if conn is None:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    failed = False
+    try:
+        cursor = conn.cursor(dictionary=True)
+        
+        total = cached_total_logs(cursor)
+        logs_data, next_cursor, prev_cursor = fetch_logs_page(cursor, token, limit)
+        format_log_times(logs_data)
+        
+        cursor.close()
+        
+        return jsonify({
+            'logs': logs_data,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+            'total': total
+        })
+    
+    except mysql.connector.Error as e:
+        failed = True
         print(f"[DATABASE ERROR] {e}")
         return jsonify({"error": "Database error"}), 500
+    
+    finally:
+        release_db_connection(conn, failed)
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events: log masuk/keluar baru ('log') dan statistik terbaru ('stats')
+
+    Tiap klien stream menahan satu thread worker. Jika batas stream_max_clients
+    tercapai, response 503 membuat EventSource di browser berhenti dan dashboard
+    beralih ke polling, sehingga thread tersisa tetap melayani request biasa.
+    """
+    subscriber = live_events.subscribe()
+    if subscriber is None:
+        return Response("Stream penuh, gunakan polling", status=503, mimetype='text/plain')
+    
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    yield subscriber.get(timeout=WEB_SETTINGS['stream_heartbeat'])
+                except queue.Empty:
+                    # Keep-alive agar proxy tidak menutup koneksi idle
+                    yield ": ping\n\n"
+        finally:
+            live_events.unsubscribe(subscriber)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    # Slot dilepas juga jika klien putus sebelum generator sempat berjalan
+    response.call_on_close(lambda: live_events.unsubscribe(subscriber))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/logs/export')
+def api_logs_export():
+    """Export logs: ?format=csv|ndjson|parquet&start=YYYY-MM-DD&end=YYYY-MM-DD&name=...&status=masuk|keluar"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format harus salah satu dari {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        where, params = parse_export_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Filter tidak valid: {e}"}), 400
+    if export_format == 'parquet' and not parquet_available():
+        return jsonify({"error": "Export parquet membutuhkan pyarrow (pip install pyarrow)"}), 501
+    
+    conn = get_db_connection()
+    if conn is None:
+        return jsonify({"error": "Database connection failed"}), 500
+    filename = f"logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    
+    if export_format == 'parquet':
+        completed = False
+        try:
+            path = write_parquet(iter_log_chunks(conn, where, params))
+            completed = True
+        except mysql.connector.Error as e:
+            print(f"[DATABASE ERROR] {e}")
+            return jsonify({"error": "Database error"}), 500
+        finally:
+            # Gagal di tengah export menyisakan hasil unbuffered: koneksi tidak dipakai ulang
+            get_pool().release(conn, discard=not completed)
+        
+        response = send_file(path, mimetype='application/vnd.apache.parquet',
+                             as_attachment=True, download_name=filename)
+        response.call_on_close(lambda: os.remove(path))
+        return response
+    
+    def generate():
+        completed = False
+        try:
+            chunks = iter_log_chunks(conn, where, params)
+            yield from (csv_stream(chunks) if export_format == 'csv' else ndjson_stream(chunks))
+            completed = True
+        except mysql.connector.Error as e:
+            print(f"[DATABASE ERROR] Export gagal: {e}")
+        finally:
+            # Export yang terputus di tengah menyisakan hasil unbuffered: koneksi tidak dipakai ulang
+            get_pool().release(conn, discard=not completed)
+    
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/pool_stats')
+def api_pool_stats():
+    """API metrik utilisasi pool koneksi database dan cache response"""
+    stats = get_pool().snapshot()
+    stats['response_cache'] = response_cache.snapshot()
+    stats['stream_subscribers'] = len(live_events.subscribers)
+    return jsonify(stats)
 
 # Error handlers
 @app.errorhandler(404)
@@ -268,14 +525,28 @@ def not_found_error(error):
 def internal_error(error):
     return render_html('error.html', message="Terjadi kesalahan internal server"), 500
 
+def run_server():
+    """Menjalankan web sesuai WEB_SERVER_SETTINGS['mode'] (env WEB_SERVER_MODE mengalahkan config)"""
+    settings = WEB_SERVER_SETTINGS
+    mode = os.environ.get('WEB_SERVER_MODE', settings['mode'])
+    port = int(os.environ.get('PORT', settings['port']))
+    
+    if mode == 'production':
+        print(f"[FLASK] Production: gunicorn {settings['workers']} worker x {settings['threads']} thread")
+        # Ganti proses ini dengan gunicorn (konfigurasi di gunicorn.conf.py)
+        os.execvp('gunicorn', ['gunicorn', '--chdir', BASE_DIR,
+                               '-c', os.path.join(BASE_DIR, 'gunicorn.conf.py'), 'wsgi:app'])
+    
+    print(f"[FLASK] Website available at: http://localhost:{port}")
+    app.run(debug=True, host=settings['host'], port=port, threaded=True)
+
 if __name__ == '__main__':
     print("[FLASK] Starting Face Recognition Website...")
-    print("[FLASK] Website available at: http://localhost:5000")
     
     # Check if required files exist
     required_files = ['index.html', 'logs.html', 'statistics.html', 'error.html']
     for file in required_files:
-        if not os.path.exists(file):
+        if not os.path.exists(os.path.join(BASE_DIR, file)):
             print(f"[WARNING] File {file} tidak ditemukan!")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    run_server()
@@ -0,0 +1,167 @@
+# benchmark_queries.py
+"""Benchmark query logs: DATE()/HOUR() vs rentang half-open, sebelum/sesudah index komposit
+
+Membuat database terpisah <database>_bench, mengisi jutaan baris log sintetis,
+mengukur latency query dengan schema lama (migration 1-3), lalu menerapkan
+migration index komposit dan mengukur ulang.
+
+    python benchmark_queries.py --rows 2000000 --repeat 5 --json hasil.json
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+from config import DB_CONFIG
+from database_setup import migrate
+
+
+def day_range(day):
+    """Rentang half-open [awal hari, awal hari berikutnya) agar index waktu bisa dipakai"""
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def seed_logs(conn, rows, days, persons, chunk=10000):
+    """Mengisi tabel logs dengan baris sintetis tersebar merata dalam `days` hari terakhir"""
+    names = [f"{2000000 + i}_Mahasiswa_{i}" for i in range(persons)] + ['Tidak Dikenali']
+    lokasi = ['Webcam', 'Tapo_C200_Office']
+    end = datetime.now()
+    span = days * 86400
+
+    cursor = conn.cursor()
+    query = """
+        INSERT INTO logs (consistent_id, nim_nama, status_masuk_keluar, waktu, lokasi)
+        VALUES (%s, %s, %s, %s, %s)
+    """
+    start = time.perf_counter()
+    for offset in range(0, rows, chunk):
+        batch = []
+        for _ in range(min(chunk, rows - offset)):
+            batch.append((
+                str(random.randrange(persons * 4)),
+                random.choice(names),
+                random.choice(('masuk', 'keluar')),
+                end - timedelta(seconds=random.randrange(span)),
+                random.choice(lokasi)
+            ))
+        cursor.executemany(query, batch)
+        conn.commit()
+        print(f"\r   🌱 {offset + len(batch):,}/{rows:,} baris", end="", flush=True)
+    cursor.close()
+    print(f"\n   ✅ Seeding selesai dalam {time.perf_counter() - start:.1f} detik")
+    return names
+
+
+def build_queries(today, person):
+    """Pasangan query lama (fungsi pada kolom) dan query sargable untuk hasil yang sama"""
+    start, end = day_range(today)
+    month_start = start - timedelta(days=30)
+    return {
+        'today_counts_date': ("""
+            SELECT COUNT(*), SUM(status_masuk_keluar = 'masuk'), SUM(status_masuk_keluar = 'keluar')
+            FROM logs WHERE DATE(waktu) = %s
+        """, (today,)),
+        'today_counts_range': ("""
+            SELECT COUNT(*), SUM(status_masuk_keluar = 'masuk'), SUM(status_masuk_keluar = 'keluar')
+            FROM logs WHERE waktu >= %s AND waktu < %s
+        """, (start, end)),
+        'hourly_date': ("""
+            SELECT HOUR(waktu), COUNT(*) FROM logs WHERE DATE(waktu) = %s GROUP BY HOUR(waktu)
+        """, (today,)),
+        'hourly_range': ("""
+            SELECT HOUR(waktu), COUNT(*) FROM logs WHERE waktu >= %s AND waktu < %s GROUP BY HOUR(waktu)
+        """, (start, end)),
+        'top_persons_30d': ("""
+            SELECT nim_nama, COUNT(*) AS activity_count FROM logs
+            WHERE waktu >= %s AND waktu < %s AND nim_nama != 'Tidak Dikenali'
+            GROUP BY nim_nama ORDER BY activity_count DESC LIMIT 10
+        """, (month_start, end)),
+        'person_history': ("""
+            SELECT waktu, status_masuk_keluar FROM logs
+            WHERE nim_nama = %s AND waktu >= %s AND waktu < %s ORDER BY waktu DESC LIMIT 50
+        """, (person, month_start, end)),
+    }
+
+
+def time_queries(conn, queries, repeat):
+    """Median latency (ms) tiap query dari `repeat` kali eksekusi"""
+    cursor = conn.cursor(buffered=True)
+    results = {}
+    for name, (sql, params) in queries.items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = round(statistics.median(samples), 2)
+    cursor.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark query logs sebelum/sesudah index komposit")
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--persons', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    config = DB_CONFIG.copy()
+    database_name = config.pop('database') + '_bench'
+
+    conn = mysql.connector.connect(**config)
+    cursor = conn.cursor()
+    print(f"📦 Membuat ulang database {database_name}...")
+    cursor.execute(f"DROP DATABASE IF EXISTS {database_name}")
+    cursor.execute(f"CREATE DATABASE {database_name}")
+    cursor.execute(f"USE {database_name}")
+    cursor.close()
+
+    # Schema sebelum index komposit
+    migrate(conn, database_name, target=3)
+    names = seed_logs(conn, args.rows, args.days, args.persons)
+
+    queries = build_queries(datetime.now().date(), names[0])
+    cursor = conn.cursor()
+    cursor.execute("ANALYZE TABLE logs")
+    cursor.fetchall()
+    print("⏱️  Mengukur query dengan index lama...")
+    before = time_queries(conn, queries, args.repeat)
+
+    start = time.perf_counter()
+    migrate(conn, database_name)
+    index_seconds = time.perf_counter() - start
+    cursor.execute("ANALYZE TABLE logs")
+    cursor.fetchall()
+    cursor.close()
+    print("⏱️  Mengukur query dengan index komposit...")
+    after = time_queries(conn, queries, args.repeat)
+    conn.close()
+
+    print(f"\n{'query':<22}{'sebelum (ms)':>14}{'sesudah (ms)':>14}{'speedup':>10}")
+    for name in queries:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f"{name:<22}{before[name]:>14.2f}{after[name]:>14.2f}{speedup:>9.1f}x")
+    print(f"\nMembuat index komposit: {index_seconds:.1f} detik untuk {args.rows:,} baris")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'rows': args.rows,
+                'repeat': args.repeat,
+                'index_build_seconds': round(index_seconds, 2),
+                'before_ms': before,
+                'after_ms': after
+            }, f, indent=2)
+        print(f"💾 Hasil disimpan ke {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# benchmark_replay.py
+"""Benchmark offline loop recognition dengan memutar ulang video / folder frame
+
+Frame diproses headless (tanpa cv2.imshow) lewat FrameProcessor yang sama
+dengan mode kamera: YOLO -> DeepSort -> InsightFace -> event masuk/keluar,
+lalu event dikirim ke AsyncLogWriter dengan DB stub. Waktu event diambil
+dari timestamp video (bukan jam dinding) sehingga jumlah event masuk/keluar
+sama berapapun kecepatan mesinnya dan hasil antar commit bisa dibandingkan.
+
+    python benchmark_replay.py rekaman.mp4 --json hasil.json
+    python benchmark_replay.py frames/ --fps 15 --warmup 20 --max-frames 1000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from config import FACE_SETTINGS, MODEL_PATHS
+from face_detector import FaceDetector
+from pipeline import FrameProcessor, OutputStage
+from camera_grabber import iter_frames
+from detector_backend import load_detector
+
+
+# Batas bucket histogram latency (ms) tetap agar histogram antar commit bisa dibandingkan
+HISTOGRAM_EDGES_MS = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float('inf')]
+
+STAGES = ['prepare', 'detect', 'track', 'recognize', 'presence', 'output', 'total']
+
+
+class StubDbHandler:
+    """Pengganti DatabaseHandler: menerima batch log tanpa koneksi MySQL"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.logs = 0
+        self.batches = 0
+        self.statistics_updates = 0
+
+    def save_logs_batch(self, rows):
+        with self.lock:
+            self.logs += len(rows)
+            self.batches += 1
+        return True
+
+    def update_statistics(self, *statistics):
+        with self.lock:
+            self.statistics_updates += 1
+        return True
+
+
+def peak_rss_mb():
+    # ru_maxrss dalam KB di Linux, byte di macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def latency_summary(samples):
+    """Statistik latency (ms) satu stage termasuk histogram dengan bucket tetap"""
+    if not samples:
+        return {'count': 0}
+    values = np.array(samples) * 1000
+    p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+    counts, _ = np.histogram(values, bins=HISTOGRAM_EDGES_MS)
+    return {
+        'count': len(values),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(p50), 3),
+        'p90_ms': round(float(p90), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'max_ms': round(float(values.max()), 3),
+        'histogram': {
+            f"<{edge:g}": int(count) for edge, count in zip(HISTOGRAM_EDGES_MS[1:], counts)
+        }
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_replay(sources, processor, output, fps=None, warmup=0, max_frames=None):
+    """Memutar semua sumber lewat processor, mengembalikan metrik mentah per stage"""
+    face_detector = processor.face_detector
+    timings = {stage: [] for stage in STAGES}
+    frames = 0
+    faces = 0
+    embeddings = 0
+    events = 0
+    measured_time = 0.0
+    clock_offset = 0.0  # detik video kumulatif antar sumber agar waktu event tetap naik
+
+    for source in sources:
+        print(f"[INFO] Memutar {source}")
+        last_video_time = 0.0
+        for frame, video_time in iter_frames(source, fps):
+            if max_frames is not None and frames >= warmup + max_frames:
+                break
+            current_time = clock_offset + video_time
+            last_video_time = video_time
+
+            t0 = time.perf_counter()
+            frame = processor.prepare_frame(frame)
+            t1 = time.perf_counter()
+            detections = processor.detect(frame, current_time)
+            t2 = time.perf_counter()
+            tracks = face_detector.tracker.update_tracks(detections, frame=frame)
+            t3 = time.perf_counter()
+            resolved, pending = processor.collect_faces(frame, tracks, current_time)
+            identified = processor.identify_crops([crop for _, _, crop in pending])
+            frame_faces = resolved + processor.resolve_faces(pending, identified, tracks, current_time)
+            t4 = time.perf_counter()
+            frame_events = processor.update_presence(frame_faces, current_time)
+            t5 = time.perf_counter()
+            for consistent_id, name, status in frame_events:
+                face_detector.event_log.append(consistent_id, name, status, current_time, 'replay')
+                output.log_event(consistent_id, name, status, 'replay')
+            t6 = time.perf_counter()
+
+            frames += 1
+            if frames <= warmup:
+                continue
+
+            for stage, elapsed in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5, t6 - t0)):
+                timings[stage].append(elapsed)
+            measured_time += t6 - t0
+            faces += len(frame_faces)
+            embeddings += len(pending)
+            events += len(frame_events)
+
+        clock_offset += last_video_time + FACE_SETTINGS['track_timeout'] + 1.0
+
+    return {
+        'timings': timings,
+        'frames': max(0, frames - warmup),
+        'faces': faces,
+        'embeddings': embeddings,
+        'events': events,
+        'measured_time': measured_time
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline loop recognition dari rekaman video")
+    parser.add_argument('sources', nargs='+', help="File video atau folder berisi frame gambar")
+    parser.add_argument('--model', default=MODEL_PATHS['default'], help="Path model YOLO (.pt)")
+    parser.add_argument('--backend', choices=['pytorch', 'onnx', 'openvino'],
+                        help="Backend YOLO (default: dari PERFORMANCE_SETTINGS/DETECTOR_SETTINGS)")
+    parser.add_argument('--int8', action='store_true', help="Pakai model ONNX INT8")
+    parser.add_argument('--dataset', default='dataset/original', help="Folder dataset wajah")
+    parser.add_argument('--fps', type=float, help="FPS sumber (default: dari video, 30 untuk folder frame)")
+    parser.add_argument('--warmup', type=int, default=10, help="Frame awal yang tidak diukur")
+    parser.add_argument('--max-frames', type=int, help="Batas frame yang diukur")
+    parser.add_argument('--json', help="Simpan hasil ke file JSON (default: cetak ke stdout)")
+    args = parser.parse_args()
+
+    rss_start = peak_rss_mb()
+    load_start = time.perf_counter()
+    model = load_detector(args.model, backend=args.backend, int8=args.int8 or None)
+    face_detector = FaceDetector()
+    face_detector.load_known_faces(args.dataset)
+    load_time = time.perf_counter() - load_start
+
+    # File spill sementara: log tertunda milik mode kamera tidak ikut diputar ke DB stub
+    spill_dir = tempfile.mkdtemp(prefix='replay_')
+    db_handler = StubDbHandler()
+    output = OutputStage(db_handler, {'spill_file': os.path.join(spill_dir, 'pending_logs.jsonl')})
+    output.start()
+    processor = FrameProcessor(model, face_detector)
+
+    try:
+        raw = run_replay(args.sources, processor, output, args.fps, args.warmup, args.max_frames)
+    finally:
+        output.stop()
+
+    measured = raw['measured_time']
+    result = {
+        'commit': git_commit(),
+        'sources': args.sources,
+        'model': args.model,
+        'backend': type(model).__name__,
+        'frames': raw['frames'],
+        'warmup_frames': args.warmup,
+        'load_time_s': round(load_time, 3),
+        'fps': round(raw['frames'] / measured, 2) if measured else 0.0,
+        'faces': raw['faces'],
+        'faces_per_sec': round(raw['faces'] / measured, 2) if measured else 0.0,
+        'embeddings': raw['embeddings'],
+        'motion_gate': processor.motion_gate.snapshot(),
+        'events': raw['events'],
+        'masuk': face_detector.total_masuk,
+        'keluar': face_detector.total_keluar,
+        'logs_written': db_handler.logs,
+        'log_batches': db_handler.batches,
+        'rss_start_mb': round(rss_start, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'stages': {stage: latency_summary(samples) for stage, samples in raw['timings'].items()}
+    }
+
+    print(f"\n{'stage':<11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for stage, summary in result['stages'].items():
+        if summary['count']:
+            print(f"{stage:<11}{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}"
+                  f"{summary['p99_ms']:>9.1f}{summary['max_ms']:>9.1f}")
+    print(f"\n{result['frames']} frame | {result['fps']} FPS | {result['faces_per_sec']} wajah/detik | "
+          f"{result['events']} event | peak RSS {result['peak_rss_mb']} MB")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Hasil disimpan ke {args.json}")
+    else:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# camera_grabber.py
+import os
+import threading
+import time
+import cv2
+
+from metrics import get_registry
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def camera_source(settings):
+    """Sumber VideoCapture dari settings kamera (index webcam atau URL RTSP)"""
+    if settings['type'] == 'webcam':
+        return settings['device_index']
+    return settings['rtsp_url']
+
+
+def open_capture(settings):
+    """Membuka VideoCapture dan menerapkan properti dari settings kamera"""
+    cap = cv2.VideoCapture(camera_source(settings))
+
+    if settings['type'] != 'webcam':
+        # Untuk RTSP, set buffer size kecil untuk reduce delay
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, settings['buffer_size'])
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, settings['width'])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, settings['height'])
+    cap.set(cv2.CAP_PROP_FPS, settings['fps'])
+    return cap
+
+
+def iter_frames(source, fps=None):
+    """Generator (frame, detik_video) dari file video atau folder berisi gambar"""
+    if os.path.isdir(source):
+        files = sorted(name for name in os.listdir(source) if name.lower().endswith(IMAGE_EXTENSIONS))
+        fps = fps or 30.0
+        for index, name in enumerate(files):
+            frame = cv2.imread(os.path.join(source, name))
+            if frame is None:
+                print(f"[WARNING] Gagal membaca {name}, dilewati")
+                continue
+            yield frame, index / fps
+        return
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Video tidak dapat dibuka: {source}")
+    fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+    index = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame, index / fps
+            index += 1
+    finally:
+        cap.release()
+
+
+class FrameGrabber:
+    """Thread yang terus memanggil grab() agar buffer kamera selalu kosong
+
+    Frame hanya di-decode (retrieve) saat diminta lewat read(), sehingga frame
+    yang diproses selalu frame terbaru berapapun lambatnya inference. Jika grab
+    gagal lebih lama dari settings['timeout'], kamera dibuka ulang setelah
+    settings['reconnect_delay'] detik.
+    """
+
+    def __init__(self, cap, settings, stats=None, ready_event=None):
+        """ready_event: Event (boleh dipakai bersama beberapa grabber) yang di-set setiap ada frame terkirim"""
+        self.cap = cap
+        self.settings = settings
+        self.stats = stats
+        self.ready_event = ready_event
+        self.metrics = get_registry()
+
+        self.cond = threading.Condition()
+        self.frame_id = 0
+        self.request_id = 0     # frame_id minimal yang diminta consumer, 0 = tidak ada permintaan
+        self.delivered = None
+        self.reconnects = 0
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._grab_loop, name='grabber', daemon=True)
+        self.thread.start()
+
+    def read(self, min_frame_id=0, timeout=None):
+        """Meminta frame terbaru dengan id >= min_frame_id, mengembalikan (frame, frame_id)"""
+        self.request(min_frame_id)
+        return self.collect(timeout)
+
+    @property
+    def reconnecting(self):
+        return self.cap is None
+
+    def request(self, min_frame_id=0):
+        """Meminta frame berikutnya tanpa menunggu (untuk meminta beberapa kamera sekaligus)"""
+        with self.cond:
+            self.request_id = max(min_frame_id, self.frame_id + 1)
+            self.delivered = None
+
+    def collect(self, timeout=None):
+        """Menunggu frame hasil request(), mengembalikan (None, frame_id) jika timeout
+
+        Jika timeout, request tetap aktif sehingga frame bisa diambil pada collect() berikutnya.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.delivered is not None or self.stop_event.is_set(), timeout)
+
+            delivered, self.delivered = self.delivered, None
+            if delivered is not None:
+                self.request_id = 0
+        if delivered is None:
+            return None, self.frame_id
+        return delivered
+
+    def release(self):
+        self.stop_event.set()
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+        if self.cap is not None:
+            self.cap.release()
+
+    def _grab_loop(self):
+        last_ok = time.time()
+
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            ok = self.cap is not None and self.cap.grab()
+            if not ok:
+                if time.time() - last_ok > self.settings['timeout']:
+                    self._reconnect()
+                    last_ok = time.time()
+                else:
+                    time.sleep(0.01)
+                continue
+            last_ok = time.time()
+
+            with self.cond:
+                self.frame_id += 1
+                wanted = self.request_id and self.frame_id >= self.request_id
+
+            if wanted:
+                # Decode hanya frame yang benar-benar akan diproses
+                with self.metrics.timer('capture'):
+                    ok, frame = self.cap.retrieve()
+                if ok and frame is not None:
+                    with self.cond:
+                        self.delivered = (frame, self.frame_id)
+                        self.cond.notify_all()
+                    if self.ready_event is not None:
+                        self.ready_event.set()
+
+            if self.stats is not None:
+                self.stats.record(time.perf_counter() - start)
+
+    def _reconnect(self):
+        """Membuka ulang kamera sampai berhasil atau grabber dihentikan"""
+        while not self.stop_event.is_set():
+            print(f"[WARNING] Kamera tidak merespon > {self.settings['timeout']} detik, "
+                  f"reconnect dalam {self.settings['reconnect_delay']} detik...")
+            if self.cap is not None:
+                self.cap.release()
+                self.cap = None
+            if self.stop_event.wait(self.settings['reconnect_delay']):
+                return
+
+            cap = open_capture(self.settings)
+            if cap.isOpened():
+                self.cap = cap
+                self.reconnects += 1
+                print("[INFO] Kamera berhasil terhubung kembali")
+                return
+            cap.release()
@@ -9,6 +9,14 @@ DB_CONFIG = {
     'port': 3306
 }
 
+# Pool koneksi bersama (app.py dan DatabaseHandler, satu pool per proses)
+DB_POOL_SETTINGS = {
+    'pool_size': 8,                 # koneksi maksimal per proses
+    'checkout_timeout': 5.0,        # detik menunggu koneksi bebas sebelum PoolTimeout
+    'health_check_interval': 30.0,  # koneksi idle lebih lama dari ini di-ping saat checkout
+    'connection_timeout': 10
+}
+
 # Model Paths
 MODEL_PATHS = {
     'custom': 'runs/detect/train2/weights/best.pt',
@@ -21,7 +29,22 @@ FACE_SETTINGS = {
     'threshold': 0.5,
     'consistent_threshold': 0.6,
     'margin_ratio': 0.05,
-    'track_timeout': 5.0
+    # 'landmarks': deteksi 5 keypoint InsightFace per crop + align (paling akurat, +1 deteksi per wajah)
+    # 'bbox': crop YOLO langsung tanpa align (lebih cepat, hanya untuk model YOLO wajah); galeri
+    # di-embed ulang dengan preprocessing yang sama, tapi akurasi turun untuk wajah miring/menoleh
+    'face_alignment': 'landmarks',
+    'track_timeout': 5.0,
+    'consistent_id_ttl': 300.0,     # ID konsisten yang idle lebih lama dari ini (detik) dibuang
+    'consistent_id_capacity': 256,  # jumlah slot awal store ID konsisten (tumbuh otomatis)
+    'track_refresh_interval': 2.0,      # detik sebelum identitas track dihitung ulang
+    'track_cache_min_similarity': 0.6,  # di bawah ini identitas track selalu dihitung ulang
+    'track_bbox_change_ratio': 0.3,     # perubahan luas bbox yang memicu recognition ulang
+    'embedding_cache_dir': 'dataset/.embedding_cache',  # cache embedding dataset (matrix float32 + manifest)
+    'gallery_backend': 'exact',  # 'exact' (matmul penuh) atau 'ivf' (ANN, untuk galeri >100k embedding)
+    'ivf_nlist': 256,   # jumlah cluster IVF
+    'ivf_nprobe': 8,    # cluster yang diperiksa per query: naikkan untuk recall, turunkan untuk latency
+    'ivf_index_path': 'dataset/.embedding_cache/ivf_index.npz',
+    'event_log_capacity': 10000   # event masuk/keluar terakhir yang disimpan di memori per kamera
 }
 
 # Konfigurasi kamera Tapo C200
@@ -64,6 +87,16 @@ if ACTIVE_CAMERA == 'webcam':
 else:
     CAMERA_SETTINGS = TAPO_CAMERA_SETTINGS
 
+# Multi kamera (python multi_camera.py): tiap kamera punya lokasi sendiri di log
+MULTI_CAMERA_SETTINGS = {
+    'cameras': [
+        {'lokasi': 'Webcam', 'settings': WEBCAM_SETTINGS},
+        {'lokasi': 'Tapo_C200_Office', 'settings': TAPO_CAMERA_SETTINGS}
+    ],
+    'frame_wait': 0.5,       # detik maksimal menunggu frame dari semua kamera per batch
+    'status_interval': 10    # detik antar print status
+}
+
 # Application Settings
 APP_SETTINGS = {
     'log_folder': 'face_recognition_logs',
@@ -72,6 +105,78 @@ APP_SETTINGS = {
     'camera_name': 'Webcam' if ACTIVE_CAMERA == 'webcam' else 'Tapo_C200_Office'
 }
 
+# Skip frame adaptif: skip_frames kamera hanya nilai awal, selanjutnya diatur
+# dari latency inference (budget CPU) dan aktivitas scene
+ADAPTIVE_SKIP_SETTINGS = {
+    'enabled': True,
+    'min_skip': 1,              # batas bawah skip saat scene ramai
+    'max_skip': 30,             # batas atas skip saat scene kosong/statis
+    'cpu_budget': 0.6,          # fraksi waktu thread inference yang boleh terpakai
+    'idle_frames': 5,           # frame tenang berturut-turut sebelum skip mulai dinaikkan
+    'motion_threshold': 0.005   # bagian piksel berubah (MotionGate.last_change) yang dianggap gerakan
+}
+
+# Gate gerakan di depan YOLO: frame tanpa perubahan memakai deteksi terakhir
+MOTION_GATE_SETTINGS = {
+    'enabled': True,
+    'width': 160,               # lebar frame grayscale kecil untuk model background
+    'learning_rate': 0.05,      # kecepatan background menyerap perubahan (running average)
+    'pixel_threshold': 25,      # selisih piksel (0-255) yang dihitung sebagai berubah
+    'min_area': 0.005,          # bagian piksel ROI yang harus berubah agar YOLO dijalankan
+    'refresh_interval': 2.0,    # YOLO tetap dijalankan minimal sekali per interval ini (detik)
+    'roi': None                 # None = seluruh frame, atau list kotak ternormalisasi [(x1, y1, x2, y2)]
+}
+
+# Penulisan log ke database secara async (batch + file spill saat DB mati)
+DB_WRITER_SETTINGS = {
+    'batch_size': 50,         # flush jika jumlah log di buffer mencapai ini
+    'flush_interval': 1.0,    # atau jika log tertua sudah menunggu selama ini (detik)
+    'queue_size': 1000,       # kapasitas queue di memori, kelebihan langsung ke file spill
+    'retry_interval': 10.0,   # jeda (detik) sebelum mencoba DB lagi setelah gagal
+    'spill_file': 'face_recognition_logs/pending_logs.jsonl'
+}
+
+# Metrik hot path recognizer: endpoint Prometheus + log [METRICS] periodik
+METRICS_SETTINGS = {
+    'enabled': True,
+    'host': '0.0.0.0',
+    'port': 9100,             # GET http://<host>:9100/metrics
+    'window_size': 1024,      # jumlah latency terakhir per stage untuk p50/p95/p99
+    'log_interval': 60.0      # detik antar log [METRICS] (0 = nonaktif)
+}
+
+# Web dashboard (app.py)
+WEB_SETTINGS = {
+    'logs_per_page': 20,
+    'logs_max_limit': 100,      # batas limit untuk /api/logs
+    'count_cache_ttl': 30.0,    # detik cache total log (dihitung dari rollup_daily)
+    'cache_ttl': 60.0,          # detik maksimal response API disimpan di cache
+    'cache_max_entries': 256,   # jumlah response maksimal di cache (LRU)
+    'version_check_interval': 1.0,  # cek tabel data_version paling sering sekali per interval ini
+    'stream_poll_interval': 0.5,    # interval pembaca event /api/stream (detik)
+    'stream_heartbeat': 15.0,       # komentar keep-alive SSE jika tidak ada event
+    'stream_max_clients': 4,        # klien /api/stream per worker; harus < WEB_SERVER_SETTINGS['threads']
+    'stream_id_window': 50,         # id log di bawah id terakhir yang dibaca ulang (log yang commit terlambat)
+    'static_extensions': ('.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.woff', '.woff2'),
+    'static_max_age': 300,                  # detik cache file static tanpa ?v=<hash>
+    'static_max_age_versioned': 31536000,   # 1 tahun untuk URL dengan hash isi (immutable)
+    'export_chunk_rows': 5000               # baris per chunk /api/logs/export (memori tetap datar)
+}
+
+# Mode server web: 'development' (Flask dev server + debug) atau 'production' (gunicorn)
+WEB_SERVER_SETTINGS = {
+    'mode': 'development',
+    'host': '0.0.0.0',
+    'port': 5000,               # env PORT (mis. Heroku) mengalahkan nilai ini
+    'workers': 2,               # proses gunicorn; tiap worker punya pool DB dan cache sendiri
+    'threads': 8,               # thread per worker (worker gthread); klien /api/stream dibatasi WEB_SETTINGS['stream_max_clients']
+    'keepalive': 5,             # detik koneksi HTTP keep-alive dibiarkan terbuka
+    'timeout': 60,              # worker yang tidak merespon selama ini di-restart
+    'graceful_timeout': 30,     # waktu menyelesaikan request saat restart/shutdown (SIGHUP/SIGTERM)
+    'max_requests': 5000,       # worker di-recycle setelah sekian request (cegah memory leak)
+    'max_requests_jitter': 500
+}
+
 # Konfigurasi tambahan untuk performa optimal
 PERFORMANCE_SETTINGS = {
     'max_workers': 4,
@@ -80,6 +185,20 @@ PERFORMANCE_SETTINGS = {
     'hardware_acceleration': 'auto'  # auto, cuda, opencl, cpu
 }
 
+# Backend YOLO saat berjalan di CPU (hardware_acceleration 'cpu', atau 'auto' tanpa CUDA)
+# 'onnx'/'openvino' opt-in: butuh pip install onnx onnxruntime (atau onnxruntime-openvino)
+DETECTOR_SETTINGS = {
+    'cpu_backend': 'pytorch',   # 'pytorch', 'onnx' (ONNX Runtime) atau 'openvino' (ONNX Runtime + OpenVINO EP)
+    'int8': False,              # pakai model INT8 hasil kuantisasi statis
+    'imgsz': 640,               # ukuran input model ONNX (tetap)
+    'threads': 4,               # intra-op thread ONNX Runtime
+    'conf': 0.25,               # confidence minimum sebelum NMS
+    'iou': 0.7,                 # threshold IoU NMS (default ultralytics, agar box sama dengan jalur PyTorch)
+    'export_dir': 'models',
+    'calibration_source': 'dataset/calibration',   # folder frame kamera atau video untuk kalibrasi INT8
+    'calibration_images': 200
+}
+
 # Konfigurasi khusus untuk jenis kamera berbeda
 CAMERA_PROFILES = {
     'webcam': {
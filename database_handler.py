@@ -2,15 +2,21 @@ import mysql.connector
 from mysql.connector import Error, DatabaseError
 from datetime import datetime
 import time
-from config import DB_CONFIG
+from config import DB_CONFIG, APP_SETTINGS
+from db_pool import get_pool
+from rollups import update_rollups
 
 class DatabaseHandler:
-    def __init__(self):
-        self.connection = None
+    def __init__(self, pool=None):
+        self.pool = pool or get_pool()
         self.is_connected = False
         self.retry_count = 0
         self.max_retries = 3
         self.retry_delay = 2
+        self.has_lokasi = False
+        self.has_rollups = False
+        self.has_data_version = False
+        self.last_statistics = None  # nilai terakhir yang berhasil ditulis ke tabel statistics
         
     def init_database(self):
         """Initialize database connection dengan error handling yang lebih baik"""
@@ -19,28 +25,36 @@ class DatabaseHandler:
             print(f"   📍 Host: {DB_CONFIG['host']}:{DB_CONFIG['port']}")
             print(f"   📊 Database: {DB_CONFIG['database']}")
             
-            # Tambahkan parameter koneksi tambahan
-            config = DB_CONFIG.copy()
-            config.update({
-                'connection_timeout': 10,
-                'buffered': True,
-                'autocommit': True,
-                'pool_size': 5,
-                'pool_name': 'face_recognition_pool'
-            })
+            # Koneksi diambil dari pool bersama (lihat DB_POOL_SETTINGS di config.py)
+            with self.pool.connection() as conn:
+                # Test connection dengan query yang lebih meaningful
+                cursor = conn.cursor()
+                cursor.execute("SELECT VERSION()")
+                version = cursor.fetchone()
+                cursor.execute("SELECT NOW()")
+                server_time = cursor.fetchone()
+                
+                # Database lama mungkin belum punya kolom lokasi (jalankan database_setup.py)
+                cursor.execute("""
+                    SELECT COUNT(*) FROM information_schema.COLUMNS 
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'logs' AND COLUMN_NAME = 'lokasi'
+                """)
+                self.has_lokasi = cursor.fetchone()[0] > 0
+                
+                # Rollup statistik dan counter versi data diperbarui bersama INSERT logs
+                # jika tabelnya sudah ada (lihat migration di database_setup.py)
+                cursor.execute("""
+                    SELECT TABLE_NAME FROM information_schema.TABLES 
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('rollup_daily', 'data_version')
+                """)
+                tables = {row[0] for row in cursor.fetchall()}
+                self.has_rollups = 'rollup_daily' in tables
+                self.has_data_version = 'data_version' in tables
+                cursor.close()
             
-            self.connection = mysql.connector.connect(**config)
             self.is_connected = True
             self.retry_count = 0
             
-            # Test connection dengan query yang lebih meaningful
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT VERSION()")
-            version = cursor.fetchone()
-            cursor.execute("SELECT NOW()")
-            server_time = cursor.fetchone()
-            cursor.close()
-            
             print(f"   ✅ Database berhasil diinisialisasi")
             print(f"   🗄️  MySQL Version: {version[0]}")
             print(f"   ⏰ Server Time: {server_time[0]}")
@@ -81,45 +95,55 @@ class DatabaseHandler:
                 return False
     
     def ensure_connection(self):
-        """Memastikan koneksi database masih aktif"""
-        if not self.is_connected or self.connection is None:
-            return self.init_database()
-        
-        try:
-            # Check if connection is still alive
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT 1")
-            cursor.close()
-            return True
-        except Error:
-            print("   🔄 Connection lost, attempting to reconnect...")
-            self.is_connected = False
+        """Memastikan database sudah diinisialisasi
+
+        Tidak ada SELECT 1 per query: pool mengecek kesehatan koneksi idle saat
+        checkout dan membuang koneksi yang putus di tengah query.
+        """
+        if not self.is_connected:
             return self.init_database()
+        return True
     
-    def save_log(self, consistent_id, name, status):
+    def save_log(self, consistent_id, name, status, lokasi=None):
         """Save face recognition log to database dengan transaction handling"""
         if not self.ensure_connection():
             return False
             
+        conn = None
         cursor = None
+        failed = False
         try:
-            cursor = self.connection.cursor()
-            query = """
-                INSERT INTO logs (consistent_id, nim_nama, status_masuk_keluar, waktu) 
-                VALUES (%s, %s, %s, %s)
-            """
-            values = (str(consistent_id), name, status, datetime.now())
+            conn = self.pool.acquire()
+            conn.start_transaction()
+            cursor = conn.cursor()
+            waktu = datetime.now()
+            if self.has_lokasi:
+                query = """
+                    INSERT INTO logs (consistent_id, nim_nama, status_masuk_keluar, waktu, lokasi) 
+                    VALUES (%s, %s, %s, %s, %s)
+                """
+                values = (str(consistent_id), name, status, waktu, lokasi or APP_SETTINGS['camera_name'])
+            else:
+                query = """
+                    INSERT INTO logs (consistent_id, nim_nama, status_masuk_keluar, waktu) 
+                    VALUES (%s, %s, %s, %s)
+                """
+                values = (str(consistent_id), name, status, waktu)
             cursor.execute(query, values)
-            self.connection.commit()
+            if self.has_rollups:
+                update_rollups(cursor, [(consistent_id, name, status, waktu)])
+            self._bump_data_version(cursor)
+            conn.commit()
             
             print(f"   📝 Log saved: {name} - {status}")
             return True
             
         except Error as e:
+            failed = True
             print(f"   ❌ [DATABASE ERROR] Failed to save log: {e}")
             # Rollback in case of error
             try:
-                self.connection.rollback()
+                conn.rollback()
             except:
                 pass
             
@@ -127,21 +151,84 @@ class DatabaseHandler:
             if "MySQL Connection not available" in str(e):
                 self.is_connected = False
                 if self.ensure_connection():
-                    return self.save_log(consistent_id, name, status)
+                    return self.save_log(consistent_id, name, status, lokasi)
             return False
             
         finally:
             if cursor:
                 cursor.close()
+            self._release(conn, failed)
+    
+    def save_logs_batch(self, rows):
+        """Menyimpan banyak log sekaligus dengan executemany (satu commit)
+
+        rows: list (consistent_id, nim_nama, status_masuk_keluar, waktu, lokasi).
+        Tidak melakukan retry; pemanggil bertanggung jawab menyimpan ulang jika gagal.
+        """
+        if not rows:
+            return True
+        if not self.ensure_connection():
+            return False
+            
+        conn = None
+        cursor = None
+        failed = False
+        try:
+            conn = self.pool.acquire()
+            conn.start_transaction()
+            cursor = conn.cursor()
+            if self.has_lokasi:
+                query = """
+                    INSERT INTO logs (consistent_id, nim_nama, status_masuk_keluar, waktu, lokasi) 
+                    VALUES (%s, %s, %s, %s, %s)
+                """
+                values = [(str(cid), name, status, waktu, lokasi or APP_SETTINGS['camera_name'])
+                          for cid, name, status, waktu, lokasi in rows]
+            else:
+                query = """
+                    INSERT INTO logs (consistent_id, nim_nama, status_masuk_keluar, waktu) 
+                    VALUES (%s, %s, %s, %s)
+                """
+                values = [(str(cid), name, status, waktu) for cid, name, status, waktu, _ in rows]
+            cursor.executemany(query, values)
+            if self.has_rollups:
+                update_rollups(cursor, [(cid, name, status, waktu) for cid, name, status, waktu, _ in rows])
+            self._bump_data_version(cursor)
+            conn.commit()
+            return True
+            
+        except Error as e:
+            failed = True
+            print(f"   ❌ [DATABASE ERROR] Failed to save {len(rows)} logs: {e}")
+            try:
+                conn.rollback()
+            except:
+                pass
+            self.is_connected = False
+            return False
+            
+        finally:
+            if cursor:
+                cursor.close()
+            self._release(conn, failed)
     
     def update_statistics(self, total_masuk, total_keluar, wajah_di_dalam, unique_faces):
         """Update statistics table dengan error handling"""
+        statistics = (total_masuk, total_keluar, wajah_di_dalam, unique_faces)
+        if statistics == self.last_statistics:
+            # Tidak ada perubahan: data_version tidak dinaikkan agar cache dashboard tetap valid
+            return True
         if not self.ensure_connection():
             return False
             
+        conn = None
         cursor = None
+        failed = False
         try:
-            cursor = self.connection.cursor()
+            conn = self.pool.acquire()
+            # Koneksi pool autocommit: statistik dan data_version harus satu transaksi
+            conn.start_transaction()
+            cursor = conn.cursor()
             
             # First, check if statistics table has data
             cursor.execute("SELECT COUNT(*) as count FROM statistics")
@@ -166,15 +253,18 @@ class DatabaseHandler:
                 values = (total_masuk, total_keluar, wajah_di_dalam, unique_faces, datetime.now())
                 
             cursor.execute(query, values)
-            self.connection.commit()
+            self._bump_data_version(cursor)
+            conn.commit()
+            self.last_statistics = statistics
             
             print(f"   📊 Statistics updated: Masuk={total_masuk}, Keluar={total_keluar}, Inside={wajah_di_dalam}, Unique={unique_faces}")
             return True
             
         except Error as e:
+            failed = True
             print(f"   ❌ [DATABASE ERROR] Failed to update statistics: {e}")
             try:
-                self.connection.rollback()
+                conn.rollback()
             except:
                 pass
             return False
@@ -182,35 +272,44 @@ class DatabaseHandler:
         finally:
             if cursor:
                 cursor.close()
+            self._release(conn, failed)
     
     def get_current_statistics(self):
         """Mengambil data statistics saat ini"""
         if not self.ensure_connection():
             return None
             
+        conn = None
         cursor = None
+        failed = False
         try:
-            cursor = self.connection.cursor(dictionary=True)
+            conn = self.pool.acquire()
+            cursor = conn.cursor(dictionary=True)
             cursor.execute("SELECT * FROM statistics WHERE id = 1")
             result = cursor.fetchone()
             return result
             
         except Error as e:
+            failed = True
             print(f"   ❌ [DATABASE ERROR] Failed to get statistics: {e}")
             return None
             
         finally:
             if cursor:
                 cursor.close()
+            self._release(conn, failed)
     
     def get_recent_logs(self, limit=10):
         """Mengambil logs terbaru"""
         if not self.ensure_connection():
             return []
             
+        conn = None
         cursor = None
+        failed = False
         try:
-            cursor = self.connection.cursor(dictionary=True)
+            conn = self.pool.acquire()
+            cursor = conn.cursor(dictionary=True)
             cursor.execute("""
                 SELECT * FROM logs 
                 ORDER BY waktu DESC 
@@ -220,21 +319,34 @@ class DatabaseHandler:
             return result
             
         except Error as e:
+            failed = True
             print(f"   ❌ [DATABASE ERROR] Failed to get recent logs: {e}")
             return []
             
         finally:
             if cursor:
                 cursor.close()
+            self._release(conn, failed)
+    
+    def _bump_data_version(self, cursor):
+        """Menaikkan versi data agar cache response web (app.py) tahu ada data baru"""
+        if self.has_data_version:
+            cursor.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+    
+    def _release(self, conn, failed=False):
+        """Mengembalikan koneksi ke pool; koneksi yang putus setelah error tidak dipakai ulang"""
+        if conn is not None:
+            self.pool.release(conn, discard=failed and not conn.is_connected())
     
     def test_connection(self):
         """Test koneksi database"""
         try:
             if self.ensure_connection():
-                cursor = self.connection.cursor()
-                cursor.execute("SELECT DATABASE(), USER(), NOW()")
-                result = cursor.fetchone()
-                cursor.close()
+                with self.pool.connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT DATABASE(), USER(), NOW()")
+                    result = cursor.fetchone()
+                    cursor.close()
                 print(f"   ✅ Connection test successful")
                 print(f"   📋 Database: {result[0]}, User: {result[1]}, Time: {result[2]}")
                 return True
@@ -243,11 +355,15 @@ class DatabaseHandler:
             print(f"   ❌ Connection test failed: {e}")
             return False
     
+    def get_pool_stats(self):
+        """Metrik utilisasi pool koneksi"""
+        return self.pool.snapshot()
+    
     def close_connection(self):
-        """Menutup koneksi database dengan aman"""
+        """Menutup koneksi idle di pool dengan aman"""
         try:
-            if self.connection and self.connection.is_connected():
-                self.connection.close()
+            if self.is_connected:
+                self.pool.close_all()
                 self.is_connected = False
                 print("   🔌 Database connection closed")
         except Error as e:
@@ -1,67 +1,191 @@
+import sys
 import mysql.connector
+from datetime import datetime
 from config import DB_CONFIG
+from rollups import create_rollup_tables, backfill_rollups
 
-def setup_database():
+
+def column_exists(cursor, database_name, table, column):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (database_name, table, column))
+    return cursor.fetchone()[0] > 0
+
+
+def table_exists(cursor, database_name, table):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+    """, (database_name, table))
+    return cursor.fetchone()[0] > 0
+
+
+def index_exists(cursor, database_name, table, index):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (database_name, table, index))
+    return cursor.fetchone()[0] > 0
+
+
+# ========== MIGRATIONS ==========
+# Tiap migration idempotent agar database lama (dibuat sebelum schema_migrations ada)
+# bisa dimigrasikan tanpa error. Tambahkan migration baru di akhir MIGRATIONS.
+
+def migration_001_initial(conn, cursor, database_name):
+    """Tabel logs dan statistics"""
+    print("📊 Membuat tabel logs...")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS logs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            consistent_id VARCHAR(255) NOT NULL,
+            nim_nama VARCHAR(255) NOT NULL,
+            status_masuk_keluar ENUM('masuk', 'keluar') NOT NULL,
+            waktu DATETIME DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_consistent_id (consistent_id),
+            INDEX idx_waktu (waktu)
+        )
+    """)
+
+    print("📈 Membuat tabel statistics...")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS statistics (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            total_masuk INT DEFAULT 0,
+            total_keluar INT DEFAULT 0,
+            wajah_di_dalam INT DEFAULT 0,
+            unique_faces INT DEFAULT 0,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+
+    print("➕ Insert data awal statistics...")
+    cursor.execute("""
+        INSERT IGNORE INTO statistics (id, total_masuk, total_keluar, wajah_di_dalam, unique_faces)
+        VALUES (1, 0, 0, 0, 0)
+    """)
+
+
+def migration_002_lokasi(conn, cursor, database_name):
+    """Kolom lokasi untuk multi kamera"""
+    if not column_exists(cursor, database_name, 'logs', 'lokasi'):
+        print("➕ Menambahkan kolom lokasi ke tabel logs...")
+        cursor.execute("ALTER TABLE logs ADD COLUMN lokasi VARCHAR(100) DEFAULT NULL AFTER waktu")
+
+
+def migration_003_rollups(conn, cursor, database_name):
+    """Tabel rollup statistik, diisi dari logs yang sudah ada"""
+    print("🧮 Membuat tabel rollup statistik...")
+    rollups_exist = table_exists(cursor, database_name, 'rollup_daily')
+    create_rollup_tables(cursor)
+    if not rollups_exist:
+        print("🔁 Mengisi rollup dari logs lama...")
+        conn.commit()
+        backfill_rollups(conn)
+
+
+def migration_004_composite_indexes(conn, cursor, database_name):
+    """Index komposit untuk query rentang waktu dan per orang
+
+    (waktu, status_masuk_keluar) melayani filter rentang waktu + hitung masuk/keluar
+    tanpa membaca baris, (nim_nama, waktu) melayani riwayat per orang. idx_waktu
+    tetap dipakai untuk keyset pagination (ORDER BY waktu DESC, id DESC): di InnoDB
+    index sekunder sudah menyimpan primary key, jadi idx_waktu efektif (waktu, id).
+    """
+    indexes = {
+        'idx_waktu': '(waktu)',
+        'idx_waktu_status': '(waktu, status_masuk_keluar)',
+        'idx_nama_waktu': '(nim_nama, waktu)'
+    }
+    for name, columns in indexes.items():
+        if not index_exists(cursor, database_name, 'logs', name):
+            print(f"🗂️  Membuat index {name} {columns}...")
+            cursor.execute(f"ALTER TABLE logs ADD INDEX {name} {columns}")
+
+
+def migration_006_data_version(conn, cursor, database_name):
+    """Counter versi data, dinaikkan setiap ada log/statistik baru (invalidasi cache web)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INT PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("INSERT IGNORE INTO data_version (id, version) VALUES (1, 0)")
+
+
+MIGRATIONS = [
+    (1, 'initial', migration_001_initial),
+    (2, 'lokasi', migration_002_lokasi),
+    (3, 'rollups', migration_003_rollups),
+    (4, 'composite_indexes', migration_004_composite_indexes),
+    # 5 (keyset_index) digabung ke 4: idx_waktu sudah mencakup (waktu, id)
+    (6, 'data_version', migration_006_data_version),
+]
+
+
+def applied_versions(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate(conn, database_name, target=None):
+    """Menjalankan migration yang belum diterapkan sampai versi target (default: terbaru)"""
+    cursor = conn.cursor(buffered=True)
+    done = applied_versions(cursor)
+    applied = []
+
+    for version, name, migration in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        print(f"⏩ Migration {version:03d}_{name}")
+        migration(conn, cursor, database_name)
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+            (version, name, datetime.now())
+        )
+        conn.commit()
+        applied.append(version)
+
+    cursor.close()
+    return applied
+
+
+def setup_database(target=None):
     """Script untuk setup database dan tabel"""
     try:
         print("🔧 Memulai setup database...")
-        
+
         # Connect tanpa database dulu
         config_temp = DB_CONFIG.copy()
         database_name = config_temp.pop('database')
-        
+
         print("📡 Menghubungkan ke MySQL server...")
         conn = mysql.connector.connect(**config_temp)
         cursor = conn.cursor()
-        
+
         # Buat database jika belum ada
         print("📦 Membuat database...")
         cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database_name}")
         cursor.execute(f"USE {database_name}")
-        
-        # Buat tabel logs
-        print("📊 Membuat tabel logs...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS logs (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                consistent_id VARCHAR(255) NOT NULL,
-                nim_nama VARCHAR(255) NOT NULL,
-                status_masuk_keluar ENUM('masuk', 'keluar') NOT NULL,
-                waktu DATETIME DEFAULT CURRENT_TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                INDEX idx_consistent_id (consistent_id),
-                INDEX idx_waktu (waktu)
-            )
-        """)
-        
-        # Buat tabel statistics
-        print("📈 Membuat tabel statistics...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS statistics (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                total_masuk INT DEFAULT 0,
-                total_keluar INT DEFAULT 0,
-                wajah_di_dalam INT DEFAULT 0,
-                unique_faces INT DEFAULT 0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Insert record statistics awal
-        print("➕ Insert data awal statistics...")
-        cursor.execute("""
-            INSERT IGNORE INTO statistics (id, total_masuk, total_keluar, wajah_di_dalam, unique_faces) 
-            VALUES (1, 0, 0, 0, 0)
-        """)
-        
-        conn.commit()
         cursor.close()
+
+        applied = migrate(conn, database_name, target)
         conn.close()
-        
+
         print("✅ Database dan tabel berhasil dibuat!")
         print(f"📁 Database: {database_name}")
-        print("📋 Tabel: logs, statistics")
-        
+        print(f"📋 Migration diterapkan: {applied or 'tidak ada (schema sudah terbaru)'}")
+
     except mysql.connector.Error as e:
         print(f"❌ Error setup database: {e}")
         print("\n💡 SOLUSI:")
@@ -71,4 +195,5 @@ def setup_database():
         print("4. Cek password di config.py")
 
 if __name__ == "__main__":
-    setup_database()
\ No newline at end of file
+    # python database_setup.py [versi_target]
+    setup_database(int(sys.argv[1]) if len(sys.argv) > 1 else None)
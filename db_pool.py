@@ -0,0 +1,181 @@
+# db_pool.py
+import threading
+import queue
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+
+from config import DB_CONFIG, DB_POOL_SETTINGS
+
+
+class PoolTimeout(Error):
+    """Tidak ada koneksi bebas dalam checkout_timeout detik"""
+
+
+class ConnectionPool:
+    """Pool koneksi MySQL yang dipakai bersama web app dan recognizer
+
+    Koneksi dibuat saat dibutuhkan sampai pool_size. Jika semua sedang dipakai,
+    checkout menunggu maksimal checkout_timeout detik lalu melempar PoolTimeout.
+    Health check dilakukan secara lazy: koneksi hanya di-ping saat checkout jika
+    sudah idle lebih lama dari health_check_interval, bukan sebelum setiap query.
+    """
+
+    def __init__(self, db_config=None, settings=None):
+        self.db_config = dict(db_config or DB_CONFIG)
+        self.settings = dict(DB_POOL_SETTINGS, **(settings or {}))
+        self.pool_size = self.settings['pool_size']
+
+        self.idle = queue.LifoQueue()   # (connection, waktu kembali ke pool)
+        self.slots = threading.BoundedSemaphore(self.pool_size)
+
+        self.lock = threading.Lock()
+        self.created = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.health_checks = 0
+        self.discarded = 0
+        self.total_wait = 0.0
+
+    def _connect(self):
+        config = dict(self.db_config)
+        config.update({
+            'connection_timeout': self.settings['connection_timeout'],
+            'autocommit': True,
+            'buffered': True
+        })
+        conn = mysql.connector.connect(**config)
+        with self.lock:
+            self.created += 1
+        return conn
+
+    def acquire(self, timeout=None):
+        """Mengambil koneksi dari pool, membuat koneksi baru jika belum ada yang idle"""
+        timeout = self.settings['checkout_timeout'] if timeout is None else timeout
+        start = time.perf_counter()
+
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.waits += 1
+            if not self.slots.acquire(timeout=timeout):
+                with self.lock:
+                    self.timeouts += 1
+                raise PoolTimeout(f"Pool penuh ({self.pool_size} koneksi dipakai) setelah {timeout} detik")
+
+        try:
+            conn = self._checkout_idle()
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            self.slots.release()
+            raise
+
+        wait = time.perf_counter() - start
+        with self.lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.checkouts += 1
+            self.total_wait += wait
+        return conn
+
+    def _checkout_idle(self):
+        """Koneksi idle yang masih sehat, atau None jika harus membuat koneksi baru"""
+        while True:
+            try:
+                conn, returned_at = self.idle.get_nowait()
+            except queue.Empty:
+                return None
+
+            if time.time() - returned_at < self.settings['health_check_interval']:
+                return conn
+
+            with self.lock:
+                self.health_checks += 1
+            try:
+                conn.ping(reconnect=False)
+                return conn
+            except Error:
+                self._close(conn)
+
+    def release(self, conn, discard=False):
+        """Mengembalikan koneksi ke pool; discard=True untuk koneksi yang rusak"""
+        with self.lock:
+            self.in_use -= 1
+        if discard:
+            self._close(conn)
+        else:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                self.idle.put((conn, time.time()))
+            except Error:
+                self._close(conn)
+        self.slots.release()
+
+    def _close(self, conn):
+        with self.lock:
+            self.discarded += 1
+            self.created -= 1
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """with pool.connection() as conn: ... koneksi otomatis dikembalikan"""
+        conn = self.acquire(timeout)
+        discard = False
+        try:
+            yield conn
+        except (mysql.connector.OperationalError, mysql.connector.InterfaceError):
+            # Koneksi putus di tengah query: jangan dikembalikan ke pool
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard)
+
+    def snapshot(self):
+        """Metrik utilisasi pool"""
+        with self.lock:
+            return {
+                'pool_size': self.pool_size,
+                'open': self.created,
+                'in_use': self.in_use,
+                'idle': self.idle.qsize(),
+                'peak_in_use': self.peak_in_use,
+                'utilization': round(self.in_use / self.pool_size, 3),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'health_checks': self.health_checks,
+                'discarded': self.discarded,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0
+            }
+
+    def close_all(self):
+        """Menutup semua koneksi idle di pool"""
+        while True:
+            try:
+                conn, _ = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Pool bersama satu proses, dibuat saat pertama dipakai"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
@@ -0,0 +1,395 @@
+# detector_backend.py
+"""Backend detektor YOLO: PyTorch (ultralytics) atau ONNX Runtime / OpenVINO di CPU
+
+Model .pt diexport sekali ke ONNX (dan opsional dikuantisasi INT8 dengan
+kalibrasi dari frame kamera sendiri), lalu dijalankan dengan ONNX Runtime
+memakai jumlah thread dari DETECTOR_SETTINGS. Hasilnya meniru objek Results
+ultralytics (results.boxes, results.names) sehingga FrameProcessor tidak
+perlu tahu backend mana yang dipakai.
+
+    python detector_backend.py export yolov8n.pt
+    python detector_backend.py quantize yolov8n.pt --calibration dataset/calibration
+    python detector_backend.py compare yolov8n.pt --frames rekaman.mp4 --json banding.json
+"""
+import argparse
+import ast
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from config import DETECTOR_SETTINGS, PERFORMANCE_SETTINGS
+
+
+class Boxes:
+    """Pengganti results.boxes ultralytics: iterasi per box dengan xyxy/conf/cls berdimensi (1, ...)"""
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self):
+        return len(self.conf)
+
+    def __iter__(self):
+        for i in range(len(self.conf)):
+            yield Boxes(self.xyxy[i:i + 1], self.conf[i:i + 1], self.cls[i:i + 1])
+
+
+class DetectionResult:
+    def __init__(self, boxes, names):
+        self.boxes = boxes
+        self.names = names
+
+
+def letterbox(frame, size):
+    """Resize dengan rasio tetap lalu padding abu-abu ke size x size (seperti ultralytics)
+
+    Mengembalikan (tensor NCHW float32, rasio, (pad_x, pad_y)).
+    """
+    height, width = frame.shape[:2]
+    ratio = min(size / height, size / width)
+    new_w, new_h = round(width * ratio), round(height * ratio)
+    pad_x, pad_y = (size - new_w) / 2, (size - new_h) / 2
+
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = round(pad_y - 0.1), round(pad_y + 0.1)
+    left, right = round(pad_x - 0.1), round(pad_x + 0.1)
+    padded = cv2.copyMakeBorder(resized, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+    blob = cv2.dnn.blobFromImage(padded, 1 / 255.0, swapRB=True)
+    return blob, ratio, (left, top)
+
+
+class OnnxYoloDetector:
+    """YOLOv8 (.onnx, FP32 atau INT8) dengan ONNX Runtime, dipanggil seperti model ultralytics"""
+
+    def __init__(self, model_path, settings=None):
+        import onnxruntime as ort
+
+        self.settings = dict(DETECTOR_SETTINGS, **(settings or {}))
+        self.model_path = model_path
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.settings['threads']
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        providers = ['CPUExecutionProvider']
+        if self.settings['cpu_backend'] == 'openvino':
+            if 'OpenVINOExecutionProvider' in ort.get_available_providers():
+                providers.insert(0, ('OpenVINOExecutionProvider', {
+                    'device_type': 'CPU', 'num_of_threads': self.settings['threads']
+                }))
+            else:
+                print("[WARNING] OpenVINOExecutionProvider tidak tersedia (pip install onnxruntime-openvino), "
+                      "memakai CPUExecutionProvider")
+
+        self.session = ort.InferenceSession(model_path, options, providers=providers)
+        self.input_name = self.session.get_inputs()[0].name
+        self.imgsz = self.session.get_inputs()[0].shape[2]
+        if not isinstance(self.imgsz, int):
+            self.imgsz = self.settings['imgsz']
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata['names']) if 'names' in metadata else {0: 'face'}
+
+    def __call__(self, frames, verbose=False, **kwargs):
+        # Sama seperti ultralytics: satu frame atau list frame, selalu mengembalikan list hasil
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        return [self.predict(frame) for frame in frames]
+
+    def predict(self, frame):
+        blob, ratio, (pad_x, pad_y) = letterbox(frame, self.imgsz)
+        output = self.session.run(None, {self.input_name: blob})[0][0]   # (4 + nc, anchors)
+
+        predictions = output.T
+        scores = predictions[:, 4:]
+        cls = scores.argmax(axis=1)
+        conf = scores[np.arange(len(scores)), cls]
+        keep = conf >= self.settings['conf']
+        predictions, cls, conf = predictions[keep], cls[keep], conf[keep]
+
+        # cx, cy, w, h (piksel input model) -> x, y, w, h untuk NMS
+        boxes = predictions[:, :4].copy()
+        boxes[:, 0] -= boxes[:, 2] / 2
+        boxes[:, 1] -= boxes[:, 3] / 2
+        indices = cv2.dnn.NMSBoxesBatched(boxes.tolist(), conf.tolist(), cls.tolist(),
+                                          self.settings['conf'], self.settings['iou']) if len(conf) else []
+        indices = np.array(indices, dtype=int).reshape(-1)
+        boxes, conf, cls = boxes[indices], conf[indices], cls[indices]
+
+        # Kembali ke koordinat frame asli
+        xyxy = np.empty_like(boxes)
+        xyxy[:, 0] = (boxes[:, 0] - pad_x) / ratio
+        xyxy[:, 1] = (boxes[:, 1] - pad_y) / ratio
+        xyxy[:, 2] = (boxes[:, 0] + boxes[:, 2] - pad_x) / ratio
+        xyxy[:, 3] = (boxes[:, 1] + boxes[:, 3] - pad_y) / ratio
+        height, width = frame.shape[:2]
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, width)
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, height)
+
+        return DetectionResult(Boxes(xyxy, conf.astype(np.float32), cls.astype(np.float32)), self.names)
+
+
+def onnx_path_for(pt_path, int8=False):
+    name = os.path.splitext(os.path.basename(pt_path))[0]
+    suffix = '_int8' if int8 else ''
+    return os.path.join(DETECTOR_SETTINGS['export_dir'], f"{name}_{DETECTOR_SETTINGS['imgsz']}{suffix}.onnx")
+
+
+def is_stale(path, source):
+    return not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source)
+
+
+def export_onnx(pt_path):
+    """Export .pt ke ONNX (batch 1, ukuran input tetap) jika belum ada atau lebih lama dari .pt"""
+    path = onnx_path_for(pt_path)
+    if not is_stale(path, pt_path):
+        return path
+
+    from ultralytics import YOLO
+
+    print(f"[INFO] Export {pt_path} ke ONNX...")
+    exported = YOLO(pt_path).export(format='onnx', imgsz=DETECTOR_SETTINGS['imgsz'], simplify=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(exported, path)
+    print(f"[INFO] Model ONNX disimpan ke {path}")
+    return path
+
+
+class FrameCalibrationReader:
+    """CalibrationDataReader ONNX Runtime dari frame kamera (folder gambar atau video)"""
+
+    def __init__(self, source, input_name, imgsz, max_images):
+        from camera_grabber import iter_frames
+
+        self.input_name = input_name
+        self.imgsz = imgsz
+        frames = iter_frames(source)
+        self.blobs = iter(
+            letterbox(frame, imgsz)[0] for _, (frame, _) in zip(range(max_images), frames)
+        )
+
+    def get_next(self):
+        blob = next(self.blobs, None)
+        return None if blob is None else {self.input_name: blob}
+
+
+def quantize_int8(pt_path, calibration_source=None):
+    """Kuantisasi statis INT8 (QDQ) model ONNX dengan kalibrasi dari frame kamera sendiri"""
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+
+    fp32_path = export_onnx(pt_path)
+    path = onnx_path_for(pt_path, int8=True)
+    calibration_source = calibration_source or DETECTOR_SETTINGS['calibration_source']
+    if not os.path.exists(calibration_source):
+        raise FileNotFoundError(f"Sumber kalibrasi tidak ditemukan: {calibration_source}")
+
+    session = ort.InferenceSession(fp32_path, providers=['CPUExecutionProvider'])
+    input_name = session.get_inputs()[0].name
+    reader = FrameCalibrationReader(calibration_source, input_name, DETECTOR_SETTINGS['imgsz'],
+                                    DETECTOR_SETTINGS['calibration_images'])
+
+    print(f"[INFO] Kuantisasi INT8 {fp32_path} dengan kalibrasi dari {calibration_source}...")
+    quantize_static(
+        fp32_path, path, reader,
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        calibrate_method=CalibrationMethod.MinMax
+    )
+
+    # Metadata (names, imgsz) dari model FP32 ikut disalin ke model INT8
+    import onnx
+    source = onnx.load(fp32_path, load_external_data=False)
+    model = onnx.load(path)
+    onnx.helper.set_model_props(model, {prop.key: prop.value for prop in source.metadata_props})
+    onnx.save(model, path)
+    print(f"[INFO] Model INT8 disimpan ke {path}")
+    return path
+
+
+def resolve_backend():
+    """Backend dari PERFORMANCE_SETTINGS['hardware_acceleration'] dan DETECTOR_SETTINGS['cpu_backend']
+
+    'cuda' -> PyTorch di GPU; 'cpu' -> backend CPU; 'auto' -> CUDA jika tersedia, selain itu backend CPU.
+    """
+    acceleration = PERFORMANCE_SETTINGS.get('hardware_acceleration', 'auto')
+    if acceleration in ('auto', 'cuda'):
+        try:
+            import torch
+            if torch.cuda.is_available():
+                return 'pytorch'
+        except ImportError:
+            pass
+        if acceleration == 'cuda':
+            print("[WARNING] CUDA tidak tersedia, memakai backend CPU")
+    elif acceleration not in ('cpu', 'auto'):
+        print(f"[WARNING] hardware_acceleration '{acceleration}' tidak didukung untuk YOLO, memakai backend CPU")
+    return DETECTOR_SETTINGS['cpu_backend']
+
+
+def load_detector(pt_path, backend=None, int8=None):
+    """Memuat detektor YOLO untuk backend yang dipilih, jatuh ke PyTorch jika ONNX Runtime tidak ada"""
+    backend = backend or resolve_backend()
+    int8 = DETECTOR_SETTINGS['int8'] if int8 is None else int8
+
+    if backend in ('onnx', 'openvino'):
+        try:
+            path = onnx_path_for(pt_path, int8=True) if int8 else export_onnx(pt_path)
+            if int8 and is_stale(path, pt_path):
+                path = quantize_int8(pt_path)
+            detector = OnnxYoloDetector(path, {'cpu_backend': backend})
+            print(f"   Backend: {backend} ({os.path.basename(path)}, {detector.settings['threads']} thread)")
+            return detector
+        except Exception as e:
+            print(f"   ⚠️  Backend {backend} gagal ({e}), memakai PyTorch")
+
+    from ultralytics import YOLO
+    print("   Backend: pytorch")
+    return YOLO(pt_path)
+
+
+def match_detections(reference, candidate, iou_threshold=0.5):
+    """Mencocokkan box kandidat ke referensi (kelas sama, IoU terbesar), mengembalikan list IoU yang cocok"""
+    matched = []
+    used = set()
+    for ref_box, ref_cls in reference:
+        best, best_iou = None, iou_threshold
+        for i, (box, cls) in enumerate(candidate):
+            if i in used or cls != ref_cls:
+                continue
+            ix1, iy1 = max(ref_box[0], box[0]), max(ref_box[1], box[1])
+            ix2, iy2 = min(ref_box[2], box[2]), min(ref_box[3], box[3])
+            inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+            union = ((ref_box[2] - ref_box[0]) * (ref_box[3] - ref_box[1])
+                     + (box[2] - box[0]) * (box[3] - box[1]) - inter)
+            iou = inter / union if union > 0 else 0.0
+            if iou >= best_iou:
+                best, best_iou = i, iou
+        if best is not None:
+            used.add(best)
+            matched.append(best_iou)
+    return matched
+
+
+def boxes_of(result, min_conf):
+    """List (xyxy, cls) box dengan confidence >= min_conf (filter yang sama dengan FrameProcessor)"""
+    return [
+        (np.asarray(box.xyxy[0], dtype=float), int(box.cls[0]))
+        for box in result.boxes if float(box.conf[0]) >= min_conf
+    ]
+
+
+def compare_backends(pt_path, source, backends, max_frames=200, warmup=5, min_conf=0.5):
+    """Latency tiap backend dan akurasi relatif terhadap PyTorch (recall/precision/IoU box yang cocok)"""
+    from camera_grabber import iter_frames
+
+    frames = [frame for _, (frame, _) in zip(range(max_frames), iter_frames(source))]
+    if not frames:
+        raise ValueError(f"Tidak ada frame dari {source}")
+
+    detections = {}
+    report = {}
+    for name, backend, int8 in backends:
+        detector = load_detector(pt_path, backend=backend, int8=int8)
+        if backend != 'pytorch' and not isinstance(detector, OnnxYoloDetector):
+            print(f"[WARNING] {name} dilewati: backend tidak dapat dimuat")
+            continue
+        for frame in frames[:warmup]:
+            detector(frame, verbose=False)
+
+        latencies = []
+        outputs = []
+        for frame in frames:
+            start = time.perf_counter()
+            result = detector(frame, verbose=False)[0]
+            latencies.append(time.perf_counter() - start)
+            outputs.append(boxes_of(result, min_conf))
+        detections[name] = outputs
+
+        values = np.array(latencies) * 1000
+        p50, p95 = np.percentile(values, [50, 95])
+        report[name] = {
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'mean_ms': round(float(values.mean()), 2),
+            'fps': round(1000 / float(values.mean()), 1),
+            'boxes': sum(len(boxes) for boxes in outputs)
+        }
+
+    reference = detections.get('pytorch')
+    if reference is not None:
+        for name, outputs in detections.items():
+            matched = []
+            for ref_boxes, boxes in zip(reference, outputs):
+                matched.extend(match_detections(ref_boxes, boxes))
+            ref_total = sum(len(boxes) for boxes in reference)
+            total = sum(len(boxes) for boxes in outputs)
+            report[name].update({
+                'recall_vs_pytorch': round(len(matched) / ref_total, 4) if ref_total else None,
+                'precision_vs_pytorch': round(len(matched) / total, 4) if total else None,
+                'mean_iou_vs_pytorch': round(float(np.mean(matched)), 4) if matched else None
+            })
+
+    return {'model': pt_path, 'source': source, 'frames': len(frames),
+            'threads': DETECTOR_SETTINGS['threads'], 'backends': report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export, kuantisasi dan perbandingan backend YOLO")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Export .pt ke ONNX")
+    export_parser.add_argument('model')
+
+    quantize_parser = subparsers.add_parser('quantize', help="Buat model ONNX INT8 terkalibrasi")
+    quantize_parser.add_argument('model')
+    quantize_parser.add_argument('--calibration', help="Folder frame atau video untuk kalibrasi")
+
+    compare_parser = subparsers.add_parser('compare', help="Bandingkan latency/akurasi PyTorch vs ONNX vs INT8")
+    compare_parser.add_argument('model')
+    compare_parser.add_argument('--frames', required=True, help="Folder frame atau video uji")
+    compare_parser.add_argument('--max-frames', type=int, default=200)
+    compare_parser.add_argument('--no-int8', action='store_true', help="Lewati model INT8")
+    compare_parser.add_argument('--json', help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        export_onnx(args.model)
+    elif args.command == 'quantize':
+        quantize_int8(args.model, args.calibration)
+    else:
+        cpu_backend = DETECTOR_SETTINGS['cpu_backend']
+        if cpu_backend == 'pytorch':
+            cpu_backend = 'onnx'
+        backends = [('pytorch', 'pytorch', False), (cpu_backend, cpu_backend, False)]
+        if not args.no_int8:
+            backends.append((f'{cpu_backend}_int8', cpu_backend, True))
+        result = compare_backends(args.model, args.frames, backends, args.max_frames)
+
+        print(f"\n{'backend':<16}{'p50 ms':>9}{'p95 ms':>9}{'fps':>8}{'recall':>9}{'precision':>11}{'IoU':>8}")
+        for name, stats in result['backends'].items():
+            recall = stats.get('recall_vs_pytorch')
+            precision = stats.get('precision_vs_pytorch')
+            iou = stats.get('mean_iou_vs_pytorch')
+            print(f"{name:<16}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['fps']:>8.1f}"
+                  f"{recall if recall is not None else '-':>9}{precision if precision is not None else '-':>11}"
+                  f"{iou if iou is not None else '-':>8}")
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2)
+            print(f"💾 Hasil disimpan ke {args.json}")
+
+
+if __name__ == "__main__":
+    main()
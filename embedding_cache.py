@@ -0,0 +1,119 @@
+# embedding_cache.py
+import os
+import json
+import hashlib
+import time
+import numpy as np
+
+from config import FACE_SETTINGS
+
+EMBEDDING_DIM = 512
+MANIFEST_VERSION = 1
+
+
+def file_sha1(path, chunk_size=1 << 20):
+    """Menghitung hash SHA1 isi file"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """Penyimpanan embedding wajah di disk (matrix float32 memory-mapped + manifest JSON)"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or FACE_SETTINGS.get('embedding_cache_dir', 'dataset/.embedding_cache')
+        self.manifest_path = os.path.join(self.cache_dir, 'manifest.json')
+
+        # path -> {'mtime', 'size', 'sha1', 'label', 'row'}; row None jika tidak ada wajah
+        self.entries = {}
+        self.matrix = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+
+    def load(self):
+        """Memuat manifest dan matrix embedding (mmap) dari disk"""
+        if not os.path.exists(self.manifest_path):
+            return False
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != MANIFEST_VERSION:
+                print("[INFO] Versi cache embedding berbeda, cache dibangun ulang")
+                return False
+
+            matrix = np.load(os.path.join(self.cache_dir, manifest['matrix']), mmap_mode='r')
+            if matrix.ndim != 2 or matrix.dtype != np.float32:
+                return False
+
+            if manifest.get('rows') != matrix.shape[0] or manifest.get('dim') != matrix.shape[1]:
+                print("[!] Cache embedding tidak konsisten, cache dibangun ulang")
+                return False
+
+            self.entries = manifest['entries']
+            self.matrix = matrix
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[!] Gagal membaca cache embedding: {e}")
+            return False
+
+    def lookup(self, path, stat):
+        """Mengembalikan entry cache yang masih valid untuk file, atau None"""
+        entry = self.entries.get(path)
+        if entry is None:
+            return None
+
+        if entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return entry
+
+        # mtime berubah (mis. file disalin ulang) tapi isi bisa saja sama
+        if entry['size'] == stat.st_size and entry['sha1'] == file_sha1(path):
+            return dict(entry, mtime=stat.st_mtime_ns)
+
+        return None
+
+    def save(self, entries, embeddings):
+        """Menulis manifest dan matrix embedding baru secara atomik"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        if embeddings:
+            matrix = np.ascontiguousarray(np.vstack(embeddings), dtype=np.float32)
+        else:
+            matrix = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+
+        # Matrix ditulis ke file baru per generasi; manifest adalah satu-satunya titik commit
+        old_matrix_name = self._read_manifest_matrix_name()
+        matrix_name = f"embeddings-{time.time_ns()}.npy"
+        matrix_path = os.path.join(self.cache_dir, matrix_name)
+        with open(matrix_path, 'wb') as f:
+            np.save(f, matrix)
+
+        tmp_manifest = self.manifest_path + '.tmp'
+        with open(tmp_manifest, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'matrix': matrix_name,
+                'rows': int(matrix.shape[0]),
+                'dim': int(matrix.shape[1]),
+                'entries': entries
+            }, f)
+
+        os.replace(tmp_manifest, self.manifest_path)
+
+        if old_matrix_name and old_matrix_name != matrix_name:
+            try:
+                os.remove(os.path.join(self.cache_dir, old_matrix_name))
+            except OSError:
+                pass
+
+        self.entries = entries
+        self.matrix = np.load(matrix_path, mmap_mode='r')
+
+    def _read_manifest_matrix_name(self):
+        """Nama file matrix yang dirujuk manifest saat ini"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('matrix')
+        except (OSError, ValueError):
+            return None
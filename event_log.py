@@ -0,0 +1,121 @@
+# event_log.py
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+EVENT_DTYPE = np.dtype([
+    ('consistent_id', np.int64),
+    ('name_idx', np.int32),
+    ('timestamp', np.float64),
+    ('lokasi_idx', np.int16),
+    ('status', np.int8),        # 1 = masuk, 0 = keluar
+])
+
+STATUS_CODES = {'masuk': 1, 'keluar': 0}
+STATUS_NAMES = {1: 'masuk', 0: 'keluar'}
+
+
+class EventLog:
+    """Ring buffer event masuk/keluar berbasis structured array NumPy
+
+    Kapasitas tetap (event terlama ditimpa), append O(1) dan query atas event
+    terbaru berupa operasi vektor. Nama dan lokasi disimpan sebagai indeks ke
+    tabel string agar tiap event hanya berukuran beberapa byte.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.events = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.next = 0       # posisi tulis berikutnya
+        self.size = 0
+
+        self.names = []
+        self.name_index = {}
+        self.locations = []
+        self.location_index = {}
+
+    def __len__(self):
+        return self.size
+
+    def _intern(self, value, values, index):
+        idx = index.get(value)
+        if idx is None:
+            idx = len(values)
+            values.append(value)
+            index[value] = idx
+        return idx
+
+    def append(self, consistent_id, name, status, timestamp=None, lokasi=None):
+        event = self.events[self.next]
+        event['consistent_id'] = consistent_id
+        event['name_idx'] = self._intern(name, self.names, self.name_index)
+        event['timestamp'] = time.time() if timestamp is None else timestamp
+        event['lokasi_idx'] = self._intern(lokasi, self.locations, self.location_index)
+        event['status'] = STATUS_CODES[status]
+
+        self.next = (self.next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def clear(self):
+        self.next = 0
+        self.size = 0
+
+    def ordered(self):
+        """Event dalam buffer urut dari terlama ke terbaru (view jika buffer belum berputar)"""
+        if self.size < self.capacity:
+            return self.events[:self.size]
+        return np.concatenate((self.events[self.next:], self.events[:self.next]))
+
+    def recent(self, n=10):
+        """n event terbaru (terbaru di akhir) sebagai list dict"""
+        return self.to_records(self.ordered()[-n:])
+
+    def since(self, timestamp):
+        """Event dengan timestamp >= timestamp"""
+        events = self.ordered()
+        return events[events['timestamp'] >= timestamp]
+
+    def count_since(self, timestamp):
+        """Jumlah (masuk, keluar) sejak timestamp"""
+        status = self.since(timestamp)['status']
+        masuk = int(np.count_nonzero(status == 1))
+        return masuk, len(status) - masuk
+
+    def last_event(self, consistent_id):
+        """Event terakhir untuk consistent_id, atau None"""
+        events = self.ordered()
+        matches = np.flatnonzero(events['consistent_id'] == consistent_id)
+        if len(matches) == 0:
+            return None
+        return self.to_records(events[matches[-1:]])[0]
+
+    def to_records(self, events):
+        return [
+            {
+                'consistent_id': int(event['consistent_id']),
+                'nim_nama': self.names[event['name_idx']],
+                'waktu': datetime.fromtimestamp(event['timestamp']),
+                'lokasi': self.locations[event['lokasi_idx']],
+                'status_masuk_keluar': STATUS_NAMES[int(event['status'])]
+            }
+            for event in events
+        ]
+
+    def to_dataframe(self):
+        """DataFrame semua event (pandas hanya di-import saat export)"""
+        import pandas as pd
+
+        events = self.ordered()
+        return pd.DataFrame({
+            'consistent_id': events['consistent_id'],
+            'nim_nama': np.array(self.names, dtype=object)[events['name_idx']],
+            'waktu': [datetime.fromtimestamp(timestamp) for timestamp in events['timestamp']],
+            'lokasi': np.array(self.locations, dtype=object)[events['lokasi_idx']],
+            'status_masuk_keluar': np.where(events['status'] == 1, 'masuk', 'keluar')
+        })
+
+    def export_csv(self, path):
+        self.to_dataframe().to_csv(path, index=False)
+        return self.size
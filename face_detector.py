@@ -2,22 +2,33 @@
 import os
 import cv2
 import numpy as np
-from ultralytics import YOLO
 import insightface
-from sklearn.metrics.pairwise import cosine_similarity
+from insightface.utils import face_align
 from deep_sort_realtime.deepsort_tracker import DeepSort
-import pandas as pd
 from datetime import datetime
 import time
 
 from config import FACE_SETTINGS, CAMERA_SETTINGS, MODEL_PATHS
+from embedding_cache import EmbeddingCache, file_sha1
+from face_gallery import FaceGallery
+from ann_index import IVFIndex
+from face_id_store import ConsistentIdStore
+from event_log import EventLog
 
 class FaceDetector:
-    def __init__(self):
-        # Inisialisasi model InsightFace
-        print("[INFO] Memuat model InsightFace...")
-        self.face_model = insightface.app.FaceAnalysis(name='buffalo_l')
-        self.face_model.prepare(ctx_id=0, det_size=(320, 320))
+    def __init__(self, shared=None):
+        """shared: FaceDetector lain yang model InsightFace, galeri dan ID konsistennya dipakai bersama
+        (multi kamera); tracker dan status masuk/keluar tetap terpisah per instance"""
+        if shared is not None:
+            self.face_model = shared.face_model
+        else:
+            # Inisialisasi model InsightFace
+            print("[INFO] Memuat model InsightFace...")
+            # Hanya detection + recognition: landmark dan genderage tidak dipakai
+            self.face_model = insightface.app.FaceAnalysis(name='buffalo_l', allowed_modules=['detection', 'recognition'])
+            self.face_model.prepare(ctx_id=0, det_size=(320, 320))
+        self.det_model = self.face_model.det_model
+        self.rec_model = self.face_model.models['recognition']
         
         # Inisialisasi Deep SORT tracker
         self.tracker = DeepSort(
@@ -29,18 +40,22 @@ class FaceDetector:
         )
         
         # Variables untuk tracking
-        self.tracked_faces = {}
+        if shared is not None:
+            self.id_store = shared.id_store
+        else:
+            self.id_store = ConsistentIdStore(
+                capacity=FACE_SETTINGS.get('consistent_id_capacity', 256),
+                ttl=FACE_SETTINGS.get('consistent_id_ttl', 300.0)
+            )
         self.face_counter = {}
-        self.next_face_id = 0
         self.track_id_mapping = {}
+        self.track_identity_cache = {}  # track_id -> hasil identifikasi terakhir
         self.reverse_track_id_mapping = {}
         self.face_status = {}
         self.face_last_seen = {}
         
-        # Logging
-        self.log_columns = ["id_log", "consistent_id", "nim_nama", "waktu", "lokasi", "status_masuk_keluar"]
-        self.log_df = pd.DataFrame(columns=self.log_columns)
-        self.log_counter = 1
+        # Logging: ring buffer event masuk/keluar (pandas hanya dipakai saat export)
+        self.event_log = EventLog(FACE_SETTINGS.get('event_log_capacity', 10000))
         
         # Counting
         self.total_masuk = 0
@@ -48,52 +63,226 @@ class FaceDetector:
         self.wajah_di_dalam = 0
         self.unique_faces_detected = set()
         
+        # Galeri wajah dikenal (diisi oleh load_known_faces)
+        self.gallery = shared.gallery if shared is not None else FaceGallery()
+        
         # Cache
         self.previous_detections = {}
     
-    def load_known_faces(self, folder_path):
-        """Memuat wajah yang dikenal dari folder"""
+    def embed_image_file(self, image_path):
+        """Menghitung embedding wajah pertama dari file gambar
+
+        Mode 'bbox' memakai preprocessing yang sama dengan crop YOLO saat live
+        (bbox + margin, padding persegi, tanpa alignment) agar embedding galeri
+        dan embedding live tetap sebanding.
+        """
+        img = cv2.imread(image_path)
+        if img is None:
+            return None, False
+        
+        # Resize image untuk mempercepat processing
+        small = cv2.resize(img, (320, 320))
+        faces = self.face_model.get(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+        if not faces:
+            return None, True
+        if FACE_SETTINGS.get('face_alignment', 'landmarks') != 'bbox':
+            return np.asarray(faces[0].embedding, dtype=np.float32), True
+        
+        # Bbox dari gambar 320x320 dikembalikan ke resolusi asli sebelum di-crop
+        scale_x = img.shape[1] / 320
+        scale_y = img.shape[0] / 320
+        x1, y1, x2, y2 = faces[0].bbox
+        x1, y1, x2, y2 = self.expand_bbox(x1 * scale_x, y1 * scale_y, x2 * scale_x, y2 * scale_y, img.shape)
+        if x2 <= x1 or y2 <= y1:
+            return None, True
+        crop = cv2.cvtColor(img[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+        feature = self.rec_model.get_feat([self.square_resize(crop, self.rec_model.input_size[0])])[0]
+        return np.asarray(feature, dtype=np.float32), True
+    
+    def load_known_faces(self, folder_path, use_cache=True):
+        """Memuat wajah yang dikenal dari folder (dengan cache embedding di disk)"""
         known_faces = []
         known_names = []
         
         print("[INFO] Memulai loading dataset wajah...")
         
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                if file.lower().endswith(('.jpg', '.jpeg', '.png')):
-                    image_path = os.path.join(root, file)
-                    img = cv2.imread(image_path)
-                    if img is not None:
-                        # Resize image untuk mempercepat processing
-                        img = cv2.resize(img, (320, 320))
-                        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                        faces = self.face_model.get(img_rgb)
-                        if faces:
-                            embedding = faces[0].embedding
-                            label = os.path.basename(root)
-                            known_faces.append(embedding)
-                            known_names.append(label)
-                            print(f"[✓] Memuat data wajah '{label}' dari {file}")
-                        else:
-                            print(f"[!] Tidak ditemukan wajah pada {file}")
-                    else:
+        cache = EmbeddingCache()
+        if use_cache and cache.load():
+            print(f"[INFO] Cache embedding dimuat: {len(cache.entries)} file")
+        
+        new_entries = {}
+        embedded = 0
+        alignment = FACE_SETTINGS.get('face_alignment', 'landmarks')
+        
+        for root, _, files in sorted(os.walk(folder_path)):
+            for file in sorted(files):
+                if not file.lower().endswith(('.jpg', '.jpeg', '.png')):
+                    continue
+                
+                image_path = os.path.join(root, file)
+                label = os.path.basename(root)
+                try:
+                    stat = os.stat(image_path)
+                except OSError:
+                    print(f"[✗] Gagal memuat {file}")
+                    continue
+                
+                entry = cache.lookup(image_path, stat) if use_cache else None
+                # Embedding dari mode alignment lain tidak sebanding, jadi di-embed ulang
+                if (entry is not None and entry['label'] == label
+                        and entry.get('alignment', 'landmarks') == alignment):
+                    embedding = cache.matrix[entry['row']] if entry['row'] is not None else None
+                else:
+                    embedding, readable = self.embed_image_file(image_path)
+                    if not readable:
                         print(f"[✗] Gagal memuat {file}")
+                        continue
+                    embedded += 1
+                    if embedding is None:
+                        print(f"[!] Tidak ditemukan wajah pada {file}")
+                    else:
+                        print(f"[✓] Memuat data wajah '{label}' dari {file}")
+                    entry = {
+                        'mtime': stat.st_mtime_ns,
+                        'size': stat.st_size,
+                        'sha1': file_sha1(image_path),
+                        'label': label,
+                        'alignment': alignment
+                    }
+                
+                row = None
+                if embedding is not None:
+                    row = len(known_faces)
+                    known_faces.append(np.array(embedding, dtype=np.float32))
+                    known_names.append(label)
+                new_entries[image_path] = dict(entry, row=row)
         
-        print(f"[INFO] Selesai memuat {len(known_faces)} wajah")
+        removed = len(set(cache.entries) - set(new_entries))
+        if use_cache and (embedded or removed or new_entries != cache.entries):
+            try:
+                cache.save(new_entries, known_faces)
+            except OSError as e:
+                print(f"[!] Gagal menyimpan cache embedding: {e}")
+        
+        self.gallery = self.build_gallery(known_faces, known_names)
+        print(f"[INFO] Selesai memuat {len(known_faces)} wajah "
+              f"({embedded} di-embed ulang, {removed} dihapus dari cache)")
         return known_faces, known_names
     
-    def recognize_identity_cosine(self, embedding, known_faces, known_names, threshold=0.5):
-        """Mengenali identitas dengan cosine similarity"""
-        if not known_faces:
-            return "Tidak Dikenali", 0
+    def build_gallery(self, known_faces, known_names):
+        """Membangun galeri sesuai backend di FACE_SETTINGS ('exact' atau 'ivf')"""
+        if FACE_SETTINGS.get('gallery_backend', 'exact') != 'ivf':
+            return FaceGallery(known_faces, known_names)
+        
+        index_path = FACE_SETTINGS['ivf_index_path']
+        gallery = FaceGallery(known_faces, known_names)
         
-        similarities = cosine_similarity([embedding], known_faces)[0]
-        best_idx = np.argmax(similarities)
+        saved = None
+        if os.path.exists(index_path):
+            try:
+                saved = IVFIndex.load(index_path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[!] Gagal memuat index IVF: {e}")
         
-        if similarities[best_idx] >= threshold:
-            return known_names[best_idx], similarities[best_idx]
+        if (saved is not None and saved.is_trained and saved.size == len(gallery)
+                and np.array_equal(saved.labels, gallery.labels)
+                and np.allclose(saved.vectors, gallery.matrix, atol=1e-6)):
+            index = saved
         else:
-            return "Tidak Dikenali", similarities[best_idx]
+            index = IVFIndex(nlist=FACE_SETTINGS['ivf_nlist'], nprobe=FACE_SETTINGS['ivf_nprobe'])
+            if len(gallery):
+                index.add(gallery.matrix, gallery.labels)
+                # Centroid lama dipakai ulang jika ada, training penuh hanya jika belum pernah
+                if saved is not None and saved.is_trained and saved.dim == index.dim:
+                    index.use_centroids(saved.centroids, saved.trained_size)
+                else:
+                    index.train()
+                try:
+                    index.save(index_path)
+                except OSError as e:
+                    print(f"[!] Gagal menyimpan index IVF: {e}")
+        
+        index.nprobe = FACE_SETTINGS['ivf_nprobe']
+        print(f"[INFO] Index IVF siap: {len(index)} embedding, nprobe={index.nprobe}")
+        return index
+    
+    def enroll_face(self, embedding, label):
+        """Menambahkan wajah baru ke galeri tanpa reload dataset"""
+        self.gallery.add([embedding], [label])
+        self._persist_gallery()
+    
+    def remove_identity(self, label):
+        """Menghapus semua embedding milik label dari galeri"""
+        removed = self.gallery.remove(label)
+        if removed:
+            self._persist_gallery()
+        return removed
+    
+    def _persist_gallery(self):
+        if isinstance(self.gallery, IVFIndex):
+            try:
+                self.gallery.save(FACE_SETTINGS['ivf_index_path'])
+            except OSError as e:
+                print(f"[!] Gagal menyimpan index IVF: {e}")
+    
+    def embed_face_crops(self, crops, executor=None):
+        """Menghitung embedding semua crop wajah (RGB) dalam satu frame dengan satu batch recognition
+
+        Mode 'landmarks' hanya menjalankan detektor InsightFace untuk 5 keypoint lalu
+        alignment; mode 'bbox' melewati deteksi ulang dan memakai crop YOLO apa adanya.
+        Jika executor diberikan, alignment tiap crop dijalankan paralel.
+        """
+        if executor is not None and len(crops) > 1:
+            aligned = list(executor.map(self.align_face_crop, crops))
+        else:
+            aligned = [self.align_face_crop(crop) for crop in crops]
+        
+        embeddings = [None] * len(crops)
+        aligned_idx = [i for i, face_img in enumerate(aligned) if face_img is not None]
+        if aligned_idx:
+            features = self.rec_model.get_feat([aligned[i] for i in aligned_idx])
+            for i, feature in zip(aligned_idx, features):
+                embeddings[i] = feature
+        
+        return embeddings
+    
+    def align_face_crop(self, crop):
+        """Menyiapkan crop wajah untuk input model recognition, None jika wajah tidak ditemukan"""
+        if crop is None or crop.size == 0:
+            return None
+        
+        image_size = self.rec_model.input_size[0]
+        if FACE_SETTINGS.get('face_alignment', 'landmarks') == 'bbox':
+            return self.square_resize(crop, image_size)
+        
+        bboxes, kpss = self.det_model.detect(crop, max_num=1)
+        if bboxes.shape[0] == 0 or kpss is None:
+            return None
+        return face_align.norm_crop(crop, landmark=kpss[0], image_size=image_size)
+    
+    def square_resize(self, img, size):
+        """Padding crop menjadi persegi lalu resize ke ukuran input model"""
+        h, w = img.shape[:2]
+        side = max(h, w)
+        top = (side - h) // 2
+        left = (side - w) // 2
+        img = cv2.copyMakeBorder(img, top, side - h - top, left, side - w - left, cv2.BORDER_CONSTANT, value=0)
+        return cv2.resize(img, (size, size))
+    
+    def recognize_identity_cosine(self, embedding, known_faces=None, known_names=None, threshold=0.5):
+        """Mengenali identitas dengan cosine similarity"""
+        if known_faces is None:
+            gallery = self.gallery
+        elif isinstance(known_faces, (FaceGallery, IVFIndex)):
+            gallery = known_faces
+        else:
+            gallery = FaceGallery(known_faces, known_names)
+        
+        return gallery.identify(embedding, threshold)
+    
+    def recognize_identities(self, embeddings, threshold=0.5):
+        """Mengenali batch embedding dalam satu frame sekaligus"""
+        return [candidates[0] for candidates in self.gallery.match(embeddings, threshold, top_k=1)]
     
     def expand_bbox(self, x1, y1, x2, y2, img_shape, margin_ratio=0.05):
         """Menambahkan padding ke bounding box"""
@@ -118,31 +307,70 @@ class FaceDetector:
         color = np.random.randint(0, 255, 3).tolist()
         return tuple(map(int, color))
     
-    def get_consistent_face_id(self, embedding, threshold=0.6):
+    def get_consistent_face_id(self, embedding, threshold=0.6, now=None):
         """Mendapatkan ID konsisten berdasarkan embedding wajah"""
-        if not self.tracked_faces:
-            new_id = self.next_face_id
-            self.tracked_faces[new_id] = embedding
-            self.next_face_id += 1
-            return new_id
-        
-        similarities = {}
-        for face_id, saved_embedding in self.tracked_faces.items():
-            similarity = cosine_similarity([embedding], [saved_embedding])[0][0]
-            similarities[face_id] = similarity
-        
-        best_id = max(similarities, key=similarities.get)
-        best_similarity = similarities[best_id]
-        
-        if best_similarity >= threshold:
-            alpha = 0.8
-            self.tracked_faces[best_id] = alpha * self.tracked_faces[best_id] + (1 - alpha) * embedding
-            return best_id
-        else:
-            new_id = self.next_face_id
-            self.tracked_faces[new_id] = embedding
-            self.next_face_id += 1
-            return new_id
+        now = time.time() if now is None else now
+        
+        # Buang ID yang sudah lama tidak terlihat agar biaya per frame tetap terbatas
+        for face_id in self.id_store.evict_idle(now):
+            if self.face_status.get(face_id) != "masuk":
+                self.face_status.pop(face_id, None)
+                self.face_last_seen.pop(face_id, None)
+                self.face_counter.pop(face_id, None)
+        
+        return self.id_store.get_id(embedding, threshold, now)
+    
+    def get_cached_track_identity(self, track_id, bbox, now=None):
+        """Mengembalikan identitas track dari cache jika masih layak dipakai, atau None
+
+        Recognition diulang jika track baru, confidence rendah, sudah melewati
+        interval refresh, atau ukuran bbox berubah signifikan.
+        """
+        now = time.time() if now is None else now
+        cached = self.track_identity_cache.get(track_id)
+        if cached is None:
+            return None
+        
+        if cached['similarity'] < FACE_SETTINGS.get('track_cache_min_similarity', 0.6):
+            return None
+        if now - cached['time'] > FACE_SETTINGS.get('track_refresh_interval', 2.0):
+            return None
+        
+        x1, y1, x2, y2 = bbox
+        area = max(1, (x2 - x1) * (y2 - y1))
+        if abs(area - cached['area']) / cached['area'] > FACE_SETTINGS.get('track_bbox_change_ratio', 0.3):
+            return None
+        
+        # ID konsisten tetap dianggap aktif walau embedding tidak dihitung ulang
+        if not self.id_store.touch(cached['consistent_id'], now):
+            return None
+        return cached
+    
+    def cache_track_identity(self, track_id, bbox, consistent_id, name, similarity, now=None):
+        """Menyimpan hasil identifikasi terakhir untuk track"""
+        x1, y1, x2, y2 = bbox
+        self.track_identity_cache[track_id] = {
+            'consistent_id': consistent_id,
+            'name': name,
+            'similarity': float(similarity),
+            'area': max(1, (x2 - x1) * (y2 - y1)),
+            'time': time.time() if now is None else now
+        }
+    
+    def prune_track_cache(self, active_track_ids):
+        """Membuang cache milik track yang sudah tidak ada di tracker"""
+        for track_id in list(self.track_identity_cache):
+            if track_id not in active_track_ids:
+                del self.track_identity_cache[track_id]
+    
+    def prune_evicted_ids(self):
+        """Membuang status ID yang sudah dievict dari store bersama oleh kamera lain"""
+        active = set(self.id_store.ids[self.id_store.ids >= 0].tolist())
+        for face_id in list(self.face_status):
+            if face_id not in active and self.face_status[face_id] != "masuk":
+                self.face_status.pop(face_id, None)
+                self.face_last_seen.pop(face_id, None)
+                self.face_counter.pop(face_id, None)
     
     def draw_simple_bbox(self, frame, x1, y1, x2, y2, label, color, confidence=0.0):
         """Menggambar bounding box sederhana"""
@@ -0,0 +1,86 @@
+# face_gallery.py
+import numpy as np
+
+UNKNOWN_LABEL = "Tidak Dikenali"
+
+
+def l2_normalize(embeddings):
+    """Normalisasi L2 per baris, hasil float32 contiguous"""
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(embeddings / norms, dtype=np.float32)
+
+
+class FaceGallery:
+    """Galeri wajah dikenal: matrix embedding ternormalisasi + array label"""
+
+    def __init__(self, embeddings=None, labels=None):
+        if embeddings is None or len(embeddings) == 0:
+            self.matrix = np.empty((0, 0), dtype=np.float32)
+            self.labels = np.empty(0, dtype=object)
+        else:
+            self.matrix = l2_normalize(np.vstack(embeddings))
+            self.labels = np.asarray(labels, dtype=object)
+
+        if len(self.labels) != self.matrix.shape[0]:
+            raise ValueError("Jumlah embedding dan label tidak sama")
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def add(self, embeddings, labels):
+        """Menambahkan embedding baru ke galeri"""
+        embeddings = l2_normalize(embeddings)
+        self.matrix = embeddings if len(self) == 0 else np.vstack([self.matrix, embeddings])
+        self.labels = np.concatenate([self.labels, np.asarray(labels, dtype=object)])
+
+    def remove(self, label):
+        """Menghapus semua embedding milik label"""
+        keep = self.labels != label
+        removed = int(len(keep) - np.count_nonzero(keep))
+        self.matrix = np.ascontiguousarray(self.matrix[keep])
+        self.labels = self.labels[keep]
+        return removed
+
+    def similarities(self, embeddings):
+        """Cosine similarity semua query terhadap galeri dalam satu perkalian matrix"""
+        return l2_normalize(embeddings) @ self.matrix.T
+
+    def match(self, embeddings, threshold=0.5, top_k=1):
+        """Mencocokkan batch embedding (N x D) ke galeri
+
+        Mengembalikan list sepanjang N, tiap elemen berisi list (label, similarity)
+        terurut menurun sebanyak top_k. Label di bawah threshold diganti "Tidak Dikenali".
+        """
+        if len(embeddings) == 0:
+            return []
+        if len(self) == 0:
+            return [[(UNKNOWN_LABEL, 0.0)] for _ in range(len(embeddings))]
+
+        scores = self.similarities(embeddings)
+        return self._rank(scores, self.labels, threshold, top_k)
+
+    def identify(self, embedding, threshold=0.5):
+        """Mengenali satu embedding, mengembalikan (label, similarity)"""
+        return self.match([embedding], threshold, top_k=1)[0][0]
+
+    @staticmethod
+    def _rank(scores, labels, threshold, top_k):
+        """Mengambil top_k kandidat per baris dari matrix skor"""
+        k = min(top_k, scores.shape[1])
+        if k == 1:
+            top_idx = np.argmax(scores, axis=1)[:, None]
+        else:
+            top_idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            order = np.argsort(-np.take_along_axis(scores, top_idx, axis=1), axis=1)
+            top_idx = np.take_along_axis(top_idx, order, axis=1)
+        top_scores = np.take_along_axis(scores, top_idx, axis=1)
+
+        results = []
+        for idx_row, score_row in zip(top_idx, top_scores):
+            results.append([
+                (labels[i] if s >= threshold else UNKNOWN_LABEL, float(s))
+                for i, s in zip(idx_row, score_row)
+            ])
+        return results
@@ -0,0 +1,96 @@
+# face_id_store.py
+import time
+import numpy as np
+
+from face_gallery import l2_normalize
+
+
+class ConsistentIdStore:
+    """Penyimpanan embedding ID konsisten berbasis matrix yang dialokasikan di awal
+
+    Tiap ID menempati satu slot. Slot milik ID yang tidak terlihat lebih lama
+    dari `ttl` detik dibebaskan dan dipakai ulang, sehingga biaya per frame
+    tetap terbatas berapapun lamanya sistem berjalan.
+    """
+
+    def __init__(self, capacity=256, dim=512, ttl=300.0, alpha=0.8):
+        self.dim = dim
+        self.ttl = ttl
+        self.alpha = alpha
+
+        self.embeddings = np.zeros((capacity, dim), dtype=np.float32)
+        self.ids = np.full(capacity, -1, dtype=np.int64)        # -1 = slot kosong
+        self.last_seen = np.zeros(capacity, dtype=np.float64)
+        self.free_slots = list(range(capacity - 1, -1, -1))
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.ids) - len(self.free_slots)
+
+    def get_id(self, embedding, threshold=0.6, now=None):
+        """Mengembalikan ID konsisten untuk embedding, membuat ID baru jika tidak ada yang cocok"""
+        now = time.time() if now is None else now
+        query = l2_normalize(embedding)[0]
+
+        active = self.ids >= 0
+        if active.any():
+            scores = self.embeddings @ query
+            scores[~active] = -np.inf
+            slot = int(np.argmax(scores))
+
+            if scores[slot] >= threshold:
+                # Update EMA in-place lalu normalisasi ulang
+                row = self.embeddings[slot]
+                row *= self.alpha
+                row += (1 - self.alpha) * query
+                row /= max(np.linalg.norm(row), 1e-12)
+                self.last_seen[slot] = now
+                return int(self.ids[slot])
+
+        return self._allocate(query, now)
+
+    def touch(self, face_id, now=None):
+        """Memperbarui waktu terakhir terlihat tanpa mengubah embedding"""
+        slots = np.flatnonzero(self.ids == face_id)
+        if len(slots) == 0:
+            return False
+        self.last_seen[slots[0]] = time.time() if now is None else now
+        return True
+
+    def evict_idle(self, now=None):
+        """Membebaskan slot ID yang idle lebih lama dari ttl, mengembalikan ID yang dihapus"""
+        now = time.time() if now is None else now
+        idle = np.flatnonzero((self.ids >= 0) & (now - self.last_seen > self.ttl))
+        if len(idle) == 0:
+            return []
+
+        evicted = self.ids[idle].tolist()
+        self.ids[idle] = -1
+        self.free_slots.extend(idle.tolist())
+        return evicted
+
+    def _allocate(self, embedding, now):
+        if not self.free_slots:
+            self._grow()
+        slot = self.free_slots.pop()
+
+        self.embeddings[slot] = embedding
+        self.ids[slot] = self.next_id
+        self.last_seen[slot] = now
+        self.next_id += 1
+        return int(self.ids[slot])
+
+    def _grow(self):
+        """Menggandakan kapasitas jika semua slot aktif dalam jendela ttl"""
+        capacity = len(self.ids)
+        new_capacity = max(2 * capacity, 1)
+
+        embeddings = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        embeddings[:capacity] = self.embeddings
+        ids = np.full(new_capacity, -1, dtype=np.int64)
+        ids[:capacity] = self.ids
+        last_seen = np.zeros(new_capacity, dtype=np.float64)
+        last_seen[:capacity] = self.last_seen
+
+        self.embeddings, self.ids, self.last_seen = embeddings, ids, last_seen
+        self.free_slots.extend(range(new_capacity - 1, capacity - 1, -1))
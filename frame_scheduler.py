@@ -0,0 +1,88 @@
+# frame_scheduler.py
+import math
+import threading
+
+from config import ADAPTIVE_SKIP_SETTINGS, FACE_SETTINGS
+
+
+class AdaptiveFrameScheduler:
+    """Menentukan skip_frames berikutnya dari latency inference dan aktivitas scene
+
+    - Budget CPU: skip minimal dipilih agar thread inference tidak sibuk lebih
+      dari cpu_budget bagian waktu (latency * fps / skip <= cpu_budget).
+    - Scene ramai (ada gerakan, track baru, atau event masuk/keluar): skip
+      langsung turun ke skip minimal tersebut.
+    - Scene statis/kosong selama idle_frames frame berturut-turut: skip naik
+      satu per frame sampai max_skip, dibatasi agar jarak antar frame tetap di
+      bawah setengah track_timeout (wajah yang diam tidak dianggap keluar).
+
+    Gerakan tidak dihitung ulang di sini: update() menerima bagian piksel yang
+    berubah dari MotionGate (last_change) untuk frame yang sama.
+    """
+
+    def __init__(self, camera_fps, initial_skip=1, settings=None):
+        self.settings = dict(ADAPTIVE_SKIP_SETTINGS, **(settings or {}))
+        self.camera_fps = max(1.0, float(camera_fps or 30))
+        self.enabled = self.settings['enabled']
+
+        self.min_skip = max(1, self.settings['min_skip'])
+        timeout_skip = int(FACE_SETTINGS['track_timeout'] * self.camera_fps / 2)
+        self.max_skip = max(self.min_skip, min(self.settings['max_skip'], timeout_skip))
+        self.skip = min(max(initial_skip, self.min_skip), self.max_skip)
+
+        self.lock = threading.Lock()
+        self.avg_latency = None
+        self.last_track_count = 0
+        self.idle_count = 0
+        self.motion = 0.0
+
+    def budget_skip(self):
+        """Skip terkecil yang menjaga inference dalam cpu_budget"""
+        if self.avg_latency is None:
+            return self.min_skip
+        return max(self.min_skip, math.ceil(self.avg_latency * self.camera_fps / self.settings['cpu_budget']))
+
+    def update(self, motion, latency, track_count, event_count=0):
+        """Dipanggil setelah satu frame diproses, mengembalikan skip untuk frame berikutnya
+
+        motion: bagian piksel yang berubah (0-1) menurut MotionGate untuk frame ini.
+        """
+        if not self.enabled:
+            return self.skip
+
+        with self.lock:
+            # EMA latency seperti StageStats
+            if self.avg_latency is None:
+                self.avg_latency = latency
+            else:
+                self.avg_latency = 0.9 * self.avg_latency + 0.1 * latency
+
+            self.motion = motion
+            active = (self.motion >= self.settings['motion_threshold']
+                      or track_count > self.last_track_count
+                      or event_count > 0)
+            self.last_track_count = track_count
+
+            busy_skip = min(self.budget_skip(), self.max_skip)
+            if active:
+                self.idle_count = 0
+                self.skip = busy_skip
+            else:
+                self.idle_count += 1
+                if self.idle_count >= self.settings['idle_frames']:
+                    self.skip = min(max(self.skip, busy_skip) + 1, self.max_skip)
+                else:
+                    self.skip = max(self.skip, busy_skip)
+            return self.skip
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'skip_frames': self.skip,
+                'min_skip': self.min_skip,
+                'max_skip': self.max_skip,
+                'budget_skip': self.budget_skip(),
+                'avg_latency_ms': round((self.avg_latency or 0.0) * 1000, 2),
+                'motion': round(self.motion, 4),
+                'idle_frames': self.idle_count
+            }
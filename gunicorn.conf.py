@@ -0,0 +1,23 @@
+# gunicorn.conf.py
+# Konfigurasi gunicorn dari WEB_SERVER_SETTINGS (config.py)
+#   gunicorn -c gunicorn.conf.py wsgi:app
+import os
+
+from config import WEB_SERVER_SETTINGS, WEB_SETTINGS
+
+bind = f"{WEB_SERVER_SETTINGS['host']}:{os.environ.get('PORT', WEB_SERVER_SETTINGS['port'])}"
+worker_class = 'gthread'
+workers = WEB_SERVER_SETTINGS['workers']
+threads = WEB_SERVER_SETTINGS['threads']
+# Klien SSE menahan thread selama tab dashboard terbuka: sisakan thread untuk request biasa
+if WEB_SETTINGS['stream_max_clients'] >= threads:
+    raise ValueError("WEB_SETTINGS['stream_max_clients'] harus lebih kecil dari WEB_SERVER_SETTINGS['threads']")
+keepalive = WEB_SERVER_SETTINGS['keepalive']
+timeout = WEB_SERVER_SETTINGS['timeout']
+graceful_timeout = WEB_SERVER_SETTINGS['graceful_timeout']
+max_requests = WEB_SERVER_SETTINGS['max_requests']
+max_requests_jitter = WEB_SERVER_SETTINGS['max_requests_jitter']
+
+# Pool koneksi DB dibuat lazy per worker setelah fork, jadi app aman di-preload
+preload_app = True
+accesslog = '-'
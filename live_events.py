@@ -0,0 +1,155 @@
+# live_events.py
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+
+from config import WEB_SETTINGS
+from db_pool import get_pool
+from rollups import fetch_today_stats
+
+
+class LiveEventBroadcaster:
+    """Satu pembaca database untuk semua subscriber /api/stream (Server-Sent Events)
+
+    Thread pembaca hanya berjalan selama ada subscriber. Tiap interval ia
+    mengecek tabel data_version (satu query primary key); hanya jika versinya
+    berubah log baru dan statistik dibaca lalu dikirim ke queue setiap
+    subscriber. Subscriber yang terlalu lambat menerima event 'resync' agar
+    memuat ulang data lewat API biasa.
+
+    Beberapa writer (recognizer per kamera) bisa commit tidak berurutan: log
+    dengan id lebih kecil kadang baru terlihat setelah id yang lebih besar.
+    Karena itu id_window id terakhir selalu dibaca ulang dan log yang sudah
+    dikirim disaring lewat published_ids.
+    """
+
+    def __init__(self, pool=None, interval=None, subscriber_queue_size=100, max_subscribers=None,
+                 id_window=None):
+        self.pool = pool
+        self.interval = WEB_SETTINGS['stream_poll_interval'] if interval is None else interval
+        self.id_window = WEB_SETTINGS['stream_id_window'] if id_window is None else id_window
+        self.subscriber_queue_size = subscriber_queue_size
+        self.max_subscribers = WEB_SETTINGS['stream_max_clients'] if max_subscribers is None else max_subscribers
+
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.thread = None
+        self.version = None
+        self.last_log_id = None
+        self.published_ids = set()
+
+    def subscribe(self):
+        """Queue event untuk satu klien, atau None jika batas klien stream sudah tercapai"""
+        subscriber = queue.Queue(maxsize=self.subscriber_queue_size)
+        with self.lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                return None
+            self.subscribers.add(subscriber)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._reader_loop, name='live-events', daemon=True)
+                self.thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        message = format_sse(event, data)
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # Subscriber tertinggal: kosongkan dan minta memuat ulang data
+                while not subscriber.empty():
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        break
+                subscriber.put_nowait(format_sse('resync', {}))
+
+    def _reader_loop(self):
+        while True:
+            with self.lock:
+                if not self.subscribers:
+                    # Berhenti saat tidak ada viewer; mulai lagi dari log terbaru saat ada subscriber baru
+                    self.thread = None
+                    self.last_log_id = None
+                    self.published_ids = set()
+                    return
+            try:
+                self._poll()
+            except Exception as e:
+                print(f"[STREAM] Gagal membaca event baru: {e}")
+            time.sleep(self.interval)
+
+    def _poll(self):
+        pool = self.pool or get_pool()
+        with pool.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT version FROM data_version WHERE id = 1")
+            row = cursor.fetchone()
+            version = row['version'] if row else 0
+
+            if self.last_log_id is None:
+                # Mulai dari log terbaru: riwayat sudah dimuat dashboard lewat API biasa
+                cursor.execute("SELECT COALESCE(MAX(id), 0) AS id FROM logs")
+                self.last_log_id = cursor.fetchone()['id']
+                cursor.execute("SELECT id FROM logs WHERE id > %s", (self.last_log_id - self.id_window,))
+                self.published_ids = {log['id'] for log in cursor.fetchall()}
+                self.version = version
+                cursor.close()
+                return
+
+            if version == self.version:
+                cursor.close()
+                return
+
+            limit = 100 + self.id_window
+            cursor.execute("""
+                SELECT * FROM logs
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (self.last_log_id - self.id_window, limit))
+            rows = cursor.fetchall()
+            if len(rows) < limit:
+                # Jika masih ada sisa log, versi lama dipertahankan agar dibaca di interval berikutnya
+                self.version = version
+            new_logs = [log for log in rows if log['id'] not in self.published_ids]
+
+            cursor.execute("SELECT * FROM statistics ORDER BY last_updated DESC LIMIT 1")
+            stats = cursor.fetchone()
+            daily = fetch_today_stats(cursor, datetime.now().date())
+            cursor.close()
+
+        for log in new_logs:
+            self.last_log_id = max(self.last_log_id, log['id'])
+            self.published_ids.add(log['id'])
+            self.publish('log', log)
+        floor = self.last_log_id - self.id_window
+        self.published_ids = {log_id for log_id in self.published_ids if log_id > floor}
+        self.publish('stats', {
+            'statistics': stats,
+            'today_stats': {
+                'total_today': daily['total'],
+                'masuk_today': daily['masuk'],
+                'keluar_today': daily['keluar']
+            }
+        })
+
+
+def format_sse(event, data):
+    """Format satu pesan Server-Sent Events"""
+    payload = json.dumps(data, default=_json_default)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
@@ -0,0 +1,101 @@
+# loadtest.py
+"""Load test endpoint dashboard: req/s dan latency p50/p95/p99 per endpoint
+
+    python loadtest.py --url http://localhost:5000 --concurrency 32 --duration 30
+    python loadtest.py --etag      # kirim If-None-Match seperti browser (uji jalur 304)
+"""
+import argparse
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+
+DEFAULT_ENDPOINTS = ['/api/dashboard_data', '/api/recent_activity', '/logs', '/statistics']
+
+
+class EndpointStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.errors = 0
+        self.not_modified = 0
+
+    def record(self, latency, status):
+        with self.lock:
+            self.latencies.append(latency)
+            if status == 304:
+                self.not_modified += 1
+            elif status >= 400:
+                self.errors += 1
+
+
+def worker(base_url, endpoints, stats, deadline, use_etag, offset):
+    etags = {}
+    index = offset
+    while time.perf_counter() < deadline:
+        endpoint = endpoints[index % len(endpoints)]
+        index += 1
+
+        request = urllib.request.Request(base_url + endpoint)
+        if use_etag and endpoint in etags:
+            request.add_header('If-None-Match', etags[endpoint])
+
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                status = response.status
+                if response.headers.get('ETag'):
+                    etags[endpoint] = response.headers['ETag']
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            status = 599
+        stats[endpoint].record(time.perf_counter() - start, status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test endpoint dashboard")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--endpoints', nargs='+', default=DEFAULT_ENDPOINTS)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--etag', action='store_true', help="Kirim If-None-Match dari response sebelumnya")
+    args = parser.parse_args()
+
+    stats = {endpoint: EndpointStats() for endpoint in args.endpoints}
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(args.url.rstrip('/'), args.endpoints, stats, deadline, args.etag, i),
+                         daemon=True)
+        for i in range(args.concurrency)
+    ]
+
+    print(f"🚀 {args.concurrency} koneksi paralel selama {args.duration:.0f} detik ke {args.url}")
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'endpoint':<24}{'req':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'304':>7}{'error':>7}")
+    total = 0
+    for endpoint, endpoint_stats in stats.items():
+        latencies = np.array(endpoint_stats.latencies) * 1000
+        count = len(latencies)
+        total += count
+        if count == 0:
+            print(f"{endpoint:<24}{0:>8}")
+            continue
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"{endpoint:<24}{count:>8}{count / elapsed:>9.1f}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}"
+              f"{endpoint_stats.not_modified:>7}{endpoint_stats.errors:>7}")
+    print(f"\nTotal: {total} request, {total / elapsed:.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# log_export.py
+"""Export tabel logs secara streaming (CSV / NDJSON / Parquet)
+
+Baris dibaca dengan cursor unbuffered lalu diproses per chunk sehingga memori
+tetap datar berapapun jumlah baris yang diexport.
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from config import WEB_SETTINGS
+
+
+EXPORT_COLUMNS = ['id', 'consistent_id', 'nim_nama', 'status_masuk_keluar', 'waktu', 'lokasi']
+EXPORT_FORMATS = ('csv', 'ndjson', 'parquet')
+
+
+def parse_export_filters(args):
+    """Filter dari query string: start/end (YYYY-MM-DD, end inklusif), name, status
+
+    Mengembalikan (where_sql, params). Tanggal diubah menjadi rentang half-open
+    [start, end + 1 hari) agar index waktu tetap dipakai. ValueError jika tidak valid.
+    """
+    clauses = []
+    params = []
+
+    start = args.get('start')
+    end = args.get('end')
+    if start:
+        clauses.append("waktu >= %s")
+        params.append(datetime.strptime(start, '%Y-%m-%d'))
+    if end:
+        clauses.append("waktu < %s")
+        params.append(datetime.strptime(end, '%Y-%m-%d') + timedelta(days=1))
+
+    name = args.get('name')
+    if name:
+        clauses.append("nim_nama = %s")
+        params.append(name)
+
+    status = args.get('status')
+    if status:
+        if status not in ('masuk', 'keluar'):
+            raise ValueError("status harus 'masuk' atau 'keluar'")
+        clauses.append("status_masuk_keluar = %s")
+        params.append(status)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def iter_log_chunks(conn, where, params, chunk_rows=None):
+    """Generator list tuple baris logs, dibaca per chunk dengan cursor unbuffered"""
+    chunk_rows = chunk_rows or WEB_SETTINGS['export_chunk_rows']
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(f"""
+            SELECT {', '.join(EXPORT_COLUMNS)} FROM logs
+            {where}
+            ORDER BY waktu, id
+        """, params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+def csv_stream(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows([_format_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def ndjson_stream(chunks):
+    for rows in chunks:
+        yield ''.join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, (_format_value(value) for value in row)))) + '\n'
+            for row in rows
+        )
+
+
+def parquet_available():
+    """True jika pandas dan pyarrow terpasang, dicek sebelum koneksi DB diambil"""
+    try:
+        import pandas
+        import pyarrow
+    except ImportError:
+        return False
+    return True
+
+
+def write_parquet(chunks):
+    """Menulis chunk ke file Parquet sementara (satu row group per chunk), mengembalikan path-nya
+
+    pandas dan pyarrow di-import di sini saja karena hanya dibutuhkan untuk export.
+    ImportError jika pyarrow tidak terpasang.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Schema tetap: chunk pertama bisa berisi lokasi NULL semua (log sebelum migration 002)
+    # sehingga schema hasil inferensi tidak cocok dengan chunk berikutnya
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('consistent_id', pa.string()),
+        ('nim_nama', pa.string()),
+        ('status_masuk_keluar', pa.string()),
+        ('waktu', pa.timestamp('us')),
+        ('lokasi', pa.string())
+    ])
+
+    fd, path = tempfile.mkstemp(suffix='.parquet')
+    os.close(fd)
+    writer = None
+    try:
+        for rows in chunks:
+            frame = pd.DataFrame.from_records(rows, columns=EXPORT_COLUMNS)
+            table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(table)
+        if writer is None:
+            # Tidak ada baris: tetap buat file dengan schema kolom
+            pq.write_table(schema.empty_table(), path)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        os.remove(path)
+        raise
+    if writer is not None:
+        writer.close()
+    return path
@@ -0,0 +1,225 @@
+# log_writer.py
+import os
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+
+from config import DB_WRITER_SETTINGS
+from metrics import get_registry
+
+
+class AsyncLogWriter:
+    """Penulis log masuk/keluar di background: batch executemany + file spill saat DB mati
+
+    submit() tidak pernah memblokir loop video. Log dikumpulkan lalu ditulis
+    sekaligus saat jumlahnya mencapai batch_size atau log tertua menunggu lebih
+    dari flush_interval. Jika DB gagal (atau queue penuh), log ditulis ke file
+    spill JSONL dan diputar ulang ke DB setelah koneksi pulih.
+    """
+
+    def __init__(self, db_handler, settings=None, stats=None):
+        self.db_handler = db_handler
+        self.settings = dict(DB_WRITER_SETTINGS, **(settings or {}))
+        self.stats = stats
+
+        self.queue = queue.Queue(maxsize=self.settings['queue_size'])
+        self.spill_path = self.settings['spill_file']
+        self.replay_path = self.spill_path + '.replay'
+        self.spill_lock = threading.Lock()
+
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.db_down_until = 0.0
+
+        self.metrics_lock = threading.Lock()
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.failed_flushes = 0
+        self.last_flush_latency = 0.0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._writer_loop, name='log-writer', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Berhenti setelah semua log di queue di-flush (ke DB atau file spill)"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=30)
+
+    def submit(self, consistent_id, name, status, lokasi=None, waktu=None):
+        """Menjadwalkan satu log; waktu dicatat sekarang agar log yang tertunda tetap akurat"""
+        row = (consistent_id, name, status, waktu or datetime.now(), lokasi)
+        try:
+            self.queue.put_nowait(('log', row))
+        except queue.Full:
+            # Queue penuh: langsung ke file spill daripada menahan loop video
+            self._spill([row])
+
+    def submit_statistics(self, statistics):
+        """Update tabel statistics lewat thread yang sama (koneksi DB tidak dipakai bersama thread lain)"""
+        try:
+            self.queue.put_nowait(('statistics', statistics))
+        except queue.Full:
+            pass
+
+    def snapshot(self):
+        with self.metrics_lock:
+            return {
+                'queue_depth': self.queue.qsize(),
+                'written': self.written,
+                'spilled': self.spilled,
+                'replayed': self.replayed,
+                'failed_flushes': self.failed_flushes,
+                'flush_latency_ms': round(self.last_flush_latency * 1000, 2),
+                'spill_pending': os.path.exists(self.spill_path) or os.path.exists(self.replay_path)
+            }
+
+    def _writer_loop(self):
+        batch = []
+        first_at = None
+        flush_interval = self.settings['flush_interval']
+
+        while not (self.stop_event.is_set() and self.queue.empty()):
+            timeout = flush_interval if first_at is None else max(0.0, first_at + flush_interval - time.time())
+            try:
+                kind, payload = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                kind = None
+
+            if kind == 'log':
+                batch.append(payload)
+                if first_at is None:
+                    first_at = time.time()
+            elif kind == 'statistics' and self._db_available():
+                self.db_handler.update_statistics(*payload)
+
+            due = first_at is not None and time.time() - first_at >= flush_interval
+            if batch and (len(batch) >= self.settings['batch_size'] or due):
+                self._flush(batch)
+                batch = []
+                first_at = None
+            elif not batch and self._db_available():
+                self._replay_spill()
+
+        self._flush(batch)
+
+    def _db_available(self):
+        return time.time() >= self.db_down_until
+
+    def _flush(self, batch):
+        if not batch:
+            return
+
+        if not self._db_available():
+            self._spill(batch)
+            return
+
+        start = time.perf_counter()
+        ok = self.db_handler.save_logs_batch(batch)
+        latency = time.perf_counter() - start
+
+        with self.metrics_lock:
+            self.last_flush_latency = latency
+            if ok:
+                self.written += len(batch)
+            else:
+                self.failed_flushes += 1
+        if self.stats is not None:
+            self.stats.record(latency)
+        get_registry().observe('db_write', latency)
+
+        if ok:
+            self._replay_spill()
+        else:
+            self.db_down_until = time.time() + self.settings['retry_interval']
+            self._spill(batch)
+
+    @staticmethod
+    def _write_rows(f, rows):
+        for consistent_id, name, status, waktu, lokasi in rows:
+            f.write(json.dumps({
+                'consistent_id': str(consistent_id),
+                'nim_nama': name,
+                'status_masuk_keluar': status,
+                'waktu': waktu.strftime('%Y-%m-%d %H:%M:%S.%f'),
+                'lokasi': lokasi
+            }) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _spill(self, rows):
+        """Menulis log ke file spill (append + fsync) agar tidak hilang saat DB mati"""
+        directory = os.path.dirname(self.spill_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self.spill_lock:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                self._write_rows(f, rows)
+
+        with self.metrics_lock:
+            self.spilled += len(rows)
+        print(f"   💾 {len(rows)} log disimpan ke {self.spill_path} (DB tidak tersedia)")
+
+    def _rewrite_replay(self, rows):
+        """Mengganti isi file .replay dengan sisa log secara atomik (file sementara + os.replace)"""
+        if not rows:
+            os.remove(self.replay_path)
+            return
+        temp_path = self.replay_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            self._write_rows(f, rows)
+        os.replace(temp_path, self.replay_path)
+
+    def _replay_spill(self):
+        """Memutar ulang log dari file spill ke DB per batch
+
+        File .replay dipotong setelah tiap batch masuk DB, sehingga jika proses
+        mati atau DB putus di tengah jalan hanya log yang belum terkirim yang
+        tersisa di file: tidak ada log yang hilang, dan paling banyak satu batch
+        terkirim ulang (jika proses mati tepat setelah commit batch tersebut).
+        """
+        replay_path = self.replay_path
+        if not os.path.exists(self.spill_path) and not os.path.exists(replay_path):
+            return
+
+        with self.spill_lock:
+            if not os.path.exists(replay_path):
+                os.replace(self.spill_path, replay_path)
+
+        rows = []
+        with open(replay_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                    rows.append((
+                        data['consistent_id'], data['nim_nama'], data['status_masuk_keluar'],
+                        datetime.strptime(data['waktu'], '%Y-%m-%d %H:%M:%S.%f'), data.get('lokasi')
+                    ))
+                except (ValueError, KeyError):
+                    print(f"   ⚠️  Baris spill rusak dilewati: {line[:80]}")
+
+        if not rows:
+            os.remove(replay_path)
+            return
+
+        batch_size = self.settings['batch_size']
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            if not self.db_handler.save_logs_batch(chunk):
+                # Sisa log tetap di file .replay, dicoba lagi setelah retry_interval
+                self.db_down_until = time.time() + self.settings['retry_interval']
+                return
+            self._rewrite_replay(rows[start + batch_size:])
+            with self.metrics_lock:
+                self.replayed += len(chunk)
+                self.written += len(chunk)
+
+        print(f"   ✅ {len(rows)} log dari file spill berhasil dikirim ke database")
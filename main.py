@@ -7,6 +7,10 @@ import sys
 from config import *
 from face_detector import FaceDetector
 from database_handler import DatabaseHandler
+from pipeline import FacePipeline
+from camera_grabber import FrameGrabber, open_capture
+from metrics import get_registry
+from detector_backend import load_detector
 
 def clear_screen():
     """Membersihkan layar terminal"""
@@ -99,28 +103,13 @@ def init_camera(camera_choice):
     """Inisialisasi kamera berdasarkan pilihan"""
     if camera_choice == "webcam":
         print(f"\n📷 Menggunakan WEBCAM (device {WEBCAM_SETTINGS['device_index']})")
-        source = WEBCAM_SETTINGS['device_index']
         settings = WEBCAM_SETTINGS
     else:
         print(f"\n🌐 Menggunakan TAPO C200 ({TAPO_CAMERA_IP})")
-        source = TAPO_CAMERA_SETTINGS['rtsp_url']
         settings = TAPO_CAMERA_SETTINGS
     
     try:
-        cap = cv2.VideoCapture(source)
-        
-        # Set properti kamera
-        if camera_choice == "webcam":
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, settings['width'])
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, settings['height'])
-            cap.set(cv2.CAP_PROP_FPS, settings['fps'])
-        else:
-            # Untuk RTSP, set buffer size kecil untuk reduce delay
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, settings['buffer_size'])
-            # Juga set resolusi dan FPS
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, settings['width'])
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, settings['height'])
-            cap.set(cv2.CAP_PROP_FPS, settings['fps'])
+        cap = open_capture(settings)
         
         # Tunggu inisialisasi
         time.sleep(2)
@@ -159,6 +148,30 @@ def check_mysql_server():
         print(f"   ❌ MySQL server tidak dapat diakses: {e}")
         return False
 
+def load_yolo_model():
+    """Memuat model YOLO pertama yang tersedia dari MODEL_PATHS"""
+    model_options = [
+        MODEL_PATHS['default'],
+        MODEL_PATHS['custom'],
+        MODEL_PATHS['fallback']
+    ]
+    
+    for model_path in model_options:
+        print(f"   Mencoba: {model_path}")
+        try:
+            if not os.path.exists(model_path):
+                print(f"   ❌ File tidak ditemukan: {model_path}")
+                continue
+                
+            model = load_detector(model_path)
+            print(f"   ✅ Model {model_path} berhasil dimuat!")
+            return model
+        except Exception as e:
+            print(f"   ❌ Gagal memuat model {model_path}: {e}")
+            continue
+    
+    return None
+
 def main_face_recognition(camera_choice):
     """Fungsi utama face recognition"""
     print(f"\n🚀 MEMULAI FACE RECOGNITION - {camera_choice.upper()}")
@@ -189,28 +202,7 @@ def main_face_recognition(camera_choice):
     
     # 3. Load model YOLO
     print("\n3. 🤖 Memuat model YOLO...")
-    model_options = [
-        MODEL_PATHS['default'],
-        MODEL_PATHS['custom'],
-        MODEL_PATHS['fallback']
-    ]
-    
-    model = None
-    for model_path in model_options:
-        print(f"   Mencoba: {model_path}")
-        try:
-            if not os.path.exists(model_path):
-                print(f"   ❌ File tidak ditemukan: {model_path}")
-                continue
-                
-            from ultralytics import YOLO
-            model = YOLO(model_path)
-            print(f"   ✅ Model {model_path} berhasil dimuat!")
-            break
-        except Exception as e:
-            print(f"   ❌ Gagal memuat model {model_path}: {e}")
-            continue
-    
+    model = load_yolo_model()
     if model is None:
         print("   ❌ Semua model gagal dimuat!")
         return
@@ -224,171 +216,55 @@ def main_face_recognition(camera_choice):
     total_start_time = time.time() - start_total_time
     print(f"\n🎯 SISTEM SIAP! Waktu startup: {total_start_time:.2f} detik")
     print(f"   📊 Status Database: {'✅ TERHUBUNG' if db_initialized else '❌ TIDAK TERHUBUNG'}")
-    print("   Kontrol: 'q'=keluar, 'r'=reset, 's'=save log, 'p'=pause")
+    print("   Kontrol: 'q'=keluar, 'r'=reset, 's'=save log, 'p'=pause, 'i'=statistik pipeline")
     
-    # Variabel untuk main loop
-    frame_count = 0
-    frame_skip_counter = 0
+    # Pipeline: capture, inference dan output (DB) berjalan di thread terpisah,
+    # main thread hanya merender karena cv2.imshow harus di main thread
+    # Grabber mengosongkan buffer kamera terus-menerus dan reconnect otomatis
+    grabber = FrameGrabber(cap, camera_settings)
+    pipeline = FacePipeline(
+        grabber, model, face_detector,
+        db_handler=db_handler if db_initialized else None,
+        skip_frames=camera_settings['skip_frames']
+    )
+    camera_type = "WEBCAM" if camera_choice == "webcam" else "TAPO C200"
+    window_title = f"Face Recognition - {camera_type}"
+    
+    frame = None
+    result = None
+    rendered_count = 0
+    fps = 0.0
     fps_update_time = time.time()
     last_fps_count = 0
-    pause = False
     
     try:
+        pipeline.start()
+        
         while True:
-            if not pause:
-                ret, frame = cap.read()
-                if not ret:
-                    print("[ERROR] Gagal membaca frame!")
-                    time.sleep(0.1)
-                    continue
-                
-                frame_count += 1
-                frame_skip_counter += 1
+            new_result = pipeline.get_result()
+            if new_result is not None:
+                result = new_result
+                render_start = time.perf_counter()
+                frame = result['frame']
+                rendered_count += 1
                 
-                # Skip frame untuk performa
-                if frame_skip_counter % camera_settings['skip_frames'] != 0:
-                    continue
+                for (x1, y1, x2, y2), consistent_id, name, similarity in result['faces']:
+                    color = face_detector.get_color_from_name(name)
+                    label_text = f"ID:{consistent_id} {name}"
+                    face_detector.draw_simple_bbox(frame, x1, y1, x2, y2, label_text, color, similarity)
                 
-                # Resize frame untuk performa
-                if frame.shape[1] > 640:
-                    frame = cv2.resize(frame, (640, 480))
-                
-                # Deteksi dengan YOLO
-                try:
-                    results = model(frame, verbose=False)[0]
-                    detections = []
-                    
-                    for box in results.boxes:
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        conf = box.conf[0].item()
-                        cls_id = int(box.cls[0])
-                        class_name = results.names[cls_id]
-                        
-                        if conf < 0.5:
-                            continue
-                        
-                        # Expand bounding box
-                        x1, y1, x2, y2 = face_detector.expand_bbox(x1, y1, x2, y2, frame.shape)
-                        
-                        bbox = [x1, y1, x2-x1, y2-y1]
-                        detections.append((bbox, conf, class_name))
-                    
-                    # Update tracker
-                    tracks = face_detector.tracker.update_tracks(detections, frame=frame)
-                    current_frame_faces = set()
-                    faces_detected_count = 0
-                    
-                    # Process tracks
-                    for track in tracks:
-                        if not track.is_confirmed():
-                            continue
-                        
-                        track_id = track.track_id
-                        ltrb = track.to_ltrb()
-                        x1, y1, x2, y2 = map(int, ltrb)
-                        
-                        # Pastikan bounding box dalam frame
-                        x1 = max(0, x1)
-                        y1 = max(0, y1)
-                        x2 = min(frame.shape[1], x2)
-                        y2 = min(frame.shape[0], y2)
-                        
-                        # Ambil crop wajah
-                        face_crop = frame[y1:y2, x1:x2]
-                        if face_crop.size == 0:
-                            continue
-                        
-                        # Deteksi wajah dengan InsightFace
-                        try:
-                            rgb_crop = cv2.cvtColor(face_crop, cv2.COLOR_BGR2RGB)
-                            faces = face_detector.face_model.get(rgb_crop)
-                            
-                            if faces:
-                                embedding = faces[0].embedding
-                                name, similarity = face_detector.recognize_identity_cosine(
-                                    embedding, known_faces, known_names, FACE_SETTINGS['threshold']
-                                )
-                                
-                                consistent_id = face_detector.get_consistent_face_id(embedding)
-                                current_frame_faces.add(consistent_id)
-                                
-                                # Periksa status masuk/keluar
-                                current_time = time.time()
-                                if consistent_id not in face_detector.face_status:
-                                    face_detector.face_status[consistent_id] = "masuk"
-                                    face_detector.face_last_seen[consistent_id] = current_time
-                                    
-                                    # Add log entry
-                                    face_detector.total_masuk += 1
-                                    face_detector.wajah_di_dalam += 1
-                                    face_detector.unique_faces_detected.add(consistent_id)
-                                    
-                                    # Simpan ke database jika terhubung
-                                    if db_initialized:
-                                        success = db_handler.save_log(consistent_id, name, "masuk")
-                                        if success:
-                                            print(f"[LOG] ID:{consistent_id} | {name} | MASUK")
-                                        else:
-                                            print(f"[LOG] ID:{consistent_id} | {name} | MASUK (DB FAILED)")
-                                    else:
-                                        print(f"[LOG] ID:{consistent_id} | {name} | MASUK")
-                                    
-                                else:
-                                    face_detector.face_last_seen[consistent_id] = current_time
-                                
-                                if consistent_id not in face_detector.face_counter:
-                                    face_detector.face_counter[consistent_id] = name
-                                
-                                faces_detected_count = len(set(face_detector.face_counter.values())) - (1 if "Tidak Dikenali" in set(face_detector.face_counter.values()) else 0)
-                                
-                                # Gambar bounding box
-                                color = face_detector.get_color_from_name(name)
-                                label_text = f"ID:{consistent_id} {name}"
-                                face_detector.draw_simple_bbox(frame, x1, y1, x2, y2, label_text, color, similarity)
-                        
-                        except Exception as face_error:
-                            continue
-                    
-                    # Periksa wajah yang keluar
-                    current_time = time.time()
-                    for consistent_id in list(face_detector.face_last_seen.keys()):
-                        if consistent_id not in current_frame_faces:
-                            if (current_time - face_detector.face_last_seen[consistent_id] > FACE_SETTINGS['track_timeout'] and 
-                                face_detector.face_status.get(consistent_id) == "masuk"):
-                                face_detector.face_status[consistent_id] = "keluar"
-                                name = face_detector.face_counter.get(consistent_id, "Tidak Dikenali")
-                                
-                                face_detector.total_keluar += 1
-                                face_detector.wajah_di_dalam = max(0, face_detector.wajah_di_dalam - 1)
-                                
-                                # Simpan ke database jika terhubung
-                                if db_initialized:
-                                    success = db_handler.save_log(consistent_id, name, "keluar")
-                                    if success:
-                                        print(f"[LOG] ID:{consistent_id} | {name} | KELUAR")
-                                    else:
-                                        print(f"[LOG] ID:{consistent_id} | {name} | KELUAR (DB FAILED)")
-                                else:
-                                    print(f"[LOG] ID:{consistent_id} | {name} | KELUAR")
-                                
-                except Exception as yolo_error:
-                    continue
-                
-                # Hitung FPS
+                # Hitung FPS (frame yang selesai diproses per detik)
                 current_time = time.time()
                 if current_time - fps_update_time >= 1.0:
-                    fps = (frame_count - last_fps_count) / (current_time - fps_update_time)
+                    fps = (rendered_count - last_fps_count) / (current_time - fps_update_time)
                     fps_update_time = current_time
-                    last_fps_count = frame_count
-                else:
-                    fps = 0
+                    last_fps_count = rendered_count
                 
-                # Info panel
-                camera_type = "WEBCAM" if camera_choice == "webcam" else "TAPO C200"
+                # Info panel (fps dipertahankan di antara update agar tidak tampil 0)
                 info_dict = {
                     "Kamera": camera_type,
-                    "Wajah": faces_detected_count,
-                    "Track": len(tracks),
+                    "Wajah": result['known_count'],
+                    "Track": result['track_count'],
                     "Masuk": face_detector.total_masuk,
                     "Keluar": face_detector.total_keluar,
                     "Di Dalam": face_detector.wajah_di_dalam,
@@ -396,15 +272,19 @@ def main_face_recognition(camera_choice):
                 }
                 
                 face_detector.draw_simple_info_panel(frame, info_dict)
-                
-                # Tampilkan status pause
-                if pause:
-                    cv2.putText(frame, "PAUSED", (frame.shape[1]//2 - 50, frame.shape[0]//2), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                render_latency = time.perf_counter() - render_start
+                pipeline.stats['render'].record(render_latency)
+                get_registry().observe('draw', render_latency)
             
             # Tampilkan frame
-            window_title = f"Face Recognition - {camera_type}"
-            cv2.imshow(window_title, frame)
+            if frame is not None:
+                display = frame
+                # Tampilkan status pause
+                if pipeline.paused:
+                    display = frame.copy()
+                    cv2.putText(display, "PAUSED", (frame.shape[1]//2 - 50, frame.shape[0]//2), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                cv2.imshow(window_title, display)
             
             # Input handling
             key = cv2.waitKey(1) & 0xFF
@@ -412,26 +292,16 @@ def main_face_recognition(camera_choice):
                 break
             elif key == ord('r'):
                 # Reset counting
-                face_detector.total_masuk = 0
-                face_detector.total_keluar = 0
-                face_detector.wajah_di_dalam = 0
-                face_detector.unique_faces_detected = set()
-                print("[INFO] Counting telah direset")
+                pipeline.request_reset()
             elif key == ord('s'):
                 print("[INFO] Menyimpan log manual...")
+                save_event_log(face_detector)
             elif key == ord('p'):
-                pause = not pause
-                status = "PAUSED" if pause else "RESUMED"
+                pipeline.paused = not pipeline.paused
+                status = "PAUSED" if pipeline.paused else "RESUMED"
                 print(f"[INFO] {status}")
-            
-            # Update statistics secara periodic jika database terhubung
-            if not pause and db_initialized and db_handler and frame_count % APP_SETTINGS['stats_update_interval'] == 0:
-                db_handler.update_statistics(
-                    face_detector.total_masuk, 
-                    face_detector.total_keluar, 
-                    face_detector.wajah_di_dalam, 
-                    len(face_detector.unique_faces_detected)
-                )
+            elif key == ord('i'):
+                print_pipeline_stats(pipeline)
     
     except Exception as main_error:
         print(f"[CRITICAL ERROR] {main_error}")
@@ -441,7 +311,7 @@ def main_face_recognition(camera_choice):
     finally:
         # Cleanup
         print("\n[INFO] Melakukan cleanup...")
-        cap.release()
+        pipeline.stop()
         cv2.destroyAllWindows()
         
         # Final statistics update jika database terhubung
@@ -453,13 +323,47 @@ def main_face_recognition(camera_choice):
                 len(face_detector.unique_faces_detected)
             )
         
+        print_pipeline_stats(pipeline)
+        
         print("\n=== SUMMARY ===")
         print(f"Kamera: {camera_type}")
         print(f"Total Masuk: {face_detector.total_masuk}")
         print(f"Total Keluar: {face_detector.total_keluar}")
         print(f"Wajah di Dalam: {face_detector.wajah_di_dalam}")
         print(f"Unique Faces: {len(face_detector.unique_faces_detected)}")
-        print(f"Total Frame: {frame_count}")
+        print(f"Total Frame: {pipeline.frames_captured}")
+
+def save_event_log(face_detector):
+    """Export event masuk/keluar di memori ke CSV (butuh pandas)"""
+    os.makedirs(APP_SETTINGS['log_folder'], exist_ok=True)
+    path = os.path.join(APP_SETTINGS['log_folder'], f"event_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    try:
+        count = face_detector.event_log.export_csv(path)
+    except ImportError:
+        print("[ERROR] pandas tidak terpasang, log tidak dapat diexport")
+        return
+    print(f"[INFO] {count} event disimpan ke {path}")
+
+def print_pipeline_stats(pipeline):
+    """Menampilkan queue depth dan latency tiap stage pipeline"""
+    print("\n=== PIPELINE STATS ===")
+    for name, stats in pipeline.snapshot().items():
+        print(f"{name:<10} queue={stats['queue_depth']:<3} latency={stats['latency_ms']:.1f}ms "
+              f"processed={stats['processed']} dropped={stats['dropped']} skipped={stats['skipped']}")
+    writer = pipeline.output.writer_snapshot()
+    if writer is not None:
+        print(f"{'db_writer':<10} queue={writer['queue_depth']:<3} flush={writer['flush_latency_ms']:.1f}ms "
+              f"written={writer['written']} spilled={writer['spilled']} replayed={writer['replayed']}")
+    scheduler = pipeline.scheduler.snapshot()
+    print(f"{'skip':<10} skip_frames={scheduler['skip_frames']} (min={scheduler['min_skip']} "
+          f"budget={scheduler['budget_skip']} max={scheduler['max_skip']}) motion={scheduler['motion']}")
+    gate = pipeline.processor.motion_gate.snapshot()
+    print(f"{'gate':<10} checked={gate['checked']} yolo_skipped={gate['gated']} "
+          f"({gate['gated_ratio'] * 100:.0f}%) change={gate['last_change']}")
+    print("--- hot path (ms) ---")
+    for name, latency in get_registry().collect()['latency'].items():
+        p50, p95, p99 = (value * 1000 for value in latency['quantiles'].values())
+        print(f"{name:<12} p50={p50:.1f} p95={p95:.1f} p99={p99:.1f} n={latency['count']}")
 
 def main():
     """Program utama dengan menu interaktif"""
@@ -0,0 +1,228 @@
+# metrics.py
+"""Timer hot path recognizer dan export metrik (Prometheus text + log terstruktur)
+
+Tiap stage (capture, yolo, tracker, insightface, matching, draw, db_write)
+menyimpan latency terakhir di ring buffer NumPy berukuran tetap, sehingga
+record() O(1) tanpa alokasi dan p50/p95/p99 dihitung hanya saat diminta
+(scrape Prometheus atau log periodik).
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from config import METRICS_SETTINGS
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyWindow:
+    """Ring buffer latency (detik) untuk persentil bergulir, plus count/sum kumulatif"""
+
+    def __init__(self, size):
+        self.samples = np.zeros(size, dtype=np.float64)
+        self.next = 0
+        self.filled = 0
+        self.count = 0
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples[self.next] = seconds
+            self.next = (self.next + 1) % len(self.samples)
+            self.filled = min(self.filled + 1, len(self.samples))
+            self.count += 1
+            self.total += seconds
+
+    def snapshot(self):
+        with self.lock:
+            samples = self.samples[:self.filled].copy()
+            count, total = self.count, self.total
+        quantiles = np.quantile(samples, QUANTILES) if len(samples) else [0.0] * len(QUANTILES)
+        return {
+            'count': count,
+            'sum': total,
+            'quantiles': dict(zip(QUANTILES, (float(q) for q in quantiles)))
+        }
+
+
+class MetricsRegistry:
+    """Kumpulan timer per stage dan collector counter/gauge dari komponen pipeline
+
+    Collector adalah fungsi tanpa argumen yang mengembalikan dict
+    {nama_stage: snapshot StageStats}; dipanggil hanya saat metrik diexport.
+    """
+
+    def __init__(self, window_size=None):
+        self.window_size = window_size or METRICS_SETTINGS['window_size']
+        self.enabled = METRICS_SETTINGS['enabled']
+        self.windows = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def _window(self, stage):
+        window = self.windows.get(stage)
+        if window is None:
+            with self.lock:
+                window = self.windows.setdefault(stage, LatencyWindow(self.window_size))
+        return window
+
+    def observe(self, stage, seconds):
+        if self.enabled:
+            self._window(stage).record(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def add_collector(self, collector):
+        with self.lock:
+            self.collectors.append(collector)
+
+    def remove_collector(self, collector):
+        with self.lock:
+            if collector in self.collectors:
+                self.collectors.remove(collector)
+
+    def collect(self):
+        """Snapshot semua metrik: {'latency': {stage: ...}, 'stages': {stage: StageStats snapshot}}"""
+        with self.lock:
+            windows = dict(self.windows)
+            collectors = list(self.collectors)
+
+        stages = {}
+        for collector in collectors:
+            try:
+                stages.update(collector())
+            except Exception as e:
+                print(f"[METRICS] Collector gagal: {e}")
+        return {
+            'latency': {stage: window.snapshot() for stage, window in sorted(windows.items())},
+            'stages': stages
+        }
+
+    def render_prometheus(self):
+        """Metrik dalam format teks eksposisi Prometheus"""
+        data = self.collect()
+        lines = [
+            '# HELP face_stage_latency_seconds Latency stage hot path (persentil dari jendela bergulir)',
+            '# TYPE face_stage_latency_seconds summary'
+        ]
+        for stage, snapshot in data['latency'].items():
+            for quantile, value in snapshot['quantiles'].items():
+                lines.append(f'face_stage_latency_seconds{{stage="{stage}",quantile="{quantile}"}} {value:.6f}')
+            lines.append(f'face_stage_latency_seconds_sum{{stage="{stage}"}} {snapshot["sum"]:.6f}')
+            lines.append(f'face_stage_latency_seconds_count{{stage="{stage}"}} {snapshot["count"]}')
+
+        counters = [
+            ('face_pipeline_processed_total', 'processed', 'Item yang selesai diproses stage pipeline'),
+            ('face_pipeline_dropped_total', 'dropped', 'Frame/item yang dibuang karena stage berikutnya tertinggal'),
+            ('face_pipeline_skipped_total', 'skipped', 'Frame yang sengaja dilewati (skip_frames)')
+        ]
+        for metric, key, description in counters:
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} counter')
+            for stage, snapshot in data['stages'].items():
+                lines.append(f'{metric}{{stage="{stage}"}} {snapshot.get(key, 0)}')
+
+        lines.append('# HELP face_pipeline_queue_depth Jumlah item menunggu di queue stage')
+        lines.append('# TYPE face_pipeline_queue_depth gauge')
+        for stage, snapshot in data['stages'].items():
+            lines.append(f'face_pipeline_queue_depth{{stage="{stage}"}} {snapshot.get("queue_depth", 0)}')
+        return '\n'.join(lines) + '\n'
+
+    def log_line(self):
+        """Satu baris JSON ringkas (latency dalam ms) untuk log periodik"""
+        data = self.collect()
+        return json.dumps({
+            'ts': round(time.time(), 3),
+            'latency_ms': {
+                stage: {
+                    f"p{int(quantile * 100)}": round(value * 1000, 2)
+                    for quantile, value in snapshot['quantiles'].items()
+                }
+                for stage, snapshot in data['latency'].items()
+            },
+            'stages': {
+                stage: {key: snapshot.get(key, 0) for key in ('processed', 'dropped', 'skipped', 'queue_depth')}
+                for stage, snapshot in data['stages'].items()
+            }
+        })
+
+
+class MetricsExporter:
+    """Endpoint HTTP /metrics (Prometheus) dan log [METRICS] periodik di thread latar belakang"""
+
+    def __init__(self, registry=None, settings=None):
+        self.registry = registry or get_registry()
+        self.settings = dict(METRICS_SETTINGS, **(settings or {}))
+        self.server = None
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        if not self.settings['enabled']:
+            return
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((self.settings['host'], self.settings['port']), Handler)
+            self.server.daemon_threads = True
+            self.threads.append(threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True))
+            print(f"[INFO] Metrik Prometheus: http://{self.settings['host']}:{self.settings['port']}/metrics")
+        except OSError as e:
+            print(f"[WARNING] Endpoint metrik tidak dapat dibuka di port {self.settings['port']}: {e}")
+
+        if self.settings['log_interval']:
+            self.threads.append(threading.Thread(target=self._log_loop, name='metrics-log', daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        for thread in self.threads:
+            thread.join(timeout=5)
+
+    def _log_loop(self):
+        while not self.stop_event.wait(self.settings['log_interval']):
+            print(f"[METRICS] {self.registry.log_line()}")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Registry metrik bersama untuk seluruh proses recognizer"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
@@ -0,0 +1,91 @@
+# motion_gate.py
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from config import MOTION_GATE_SETTINGS
+
+
+class MotionGate:
+    """Detektor perubahan murah di depan YOLO
+
+    Frame diperkecil ke grayscale (lebar `width`), di-blur, lalu dibandingkan
+    dengan model background (running average). Jika bagian piksel berubah di
+    dalam ROI kurang dari min_area, YOLO tidak perlu dijalankan. YOLO tetap
+    dipaksa jalan minimal sekali per refresh_interval detik agar orang yang
+    diam lama (sudah menyatu dengan background) tetap terdeteksi ulang.
+
+    last_change juga dipakai AdaptiveFrameScheduler sebagai ukuran gerakan,
+    sehingga perubahan tetap diukur walaupun gate dimatikan.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = dict(MOTION_GATE_SETTINGS, **(settings or {}))
+        self.enabled = self.settings['enabled']
+        self.background = None
+        self.mask = None
+        self.last_detect_at = 0.0
+
+        self.lock = threading.Lock()
+        self.checked = 0
+        self.gated = 0
+        self.last_change = 0.0
+
+    def _prepare(self, frame):
+        height, width = frame.shape[:2]
+        size = (self.settings['width'], max(1, round(height * self.settings['width'] / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def _roi_mask(self, shape):
+        """Mask ROI dari daftar kotak ternormalisasi (x1, y1, x2, y2); None = seluruh frame"""
+        rois = self.settings['roi']
+        if not rois:
+            return None
+        height, width = shape
+        mask = np.zeros(shape, dtype=bool)
+        for x1, y1, x2, y2 in rois:
+            mask[int(y1 * height):int(y2 * height), int(x1 * width):int(x2 * width)] = True
+        return mask
+
+    def should_detect(self, frame, now=None):
+        """True jika YOLO perlu dijalankan untuk frame ini; model background selalu diperbarui"""
+        now = time.monotonic() if now is None else now
+        small = self._prepare(frame)
+
+        if self.background is None or self.background.shape != small.shape:
+            self.background = small.astype(np.float32)
+            self.mask = self._roi_mask(small.shape)
+            change = 1.0
+        else:
+            diff = cv2.absdiff(small, cv2.convertScaleAbs(self.background)) > self.settings['pixel_threshold']
+            if self.mask is not None:
+                diff = diff[self.mask]
+            change = float(np.count_nonzero(diff)) / max(1, diff.size)
+            cv2.accumulateWeighted(small, self.background, self.settings['learning_rate'])
+
+        detect = (not self.enabled
+                  or change >= self.settings['min_area']
+                  or now - self.last_detect_at >= self.settings['refresh_interval'])
+        if detect:
+            self.last_detect_at = now
+
+        with self.lock:
+            self.checked += 1
+            self.last_change = change
+            if not detect:
+                self.gated += 1
+        return detect
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'checked': self.checked,
+                'gated': self.gated,
+                'gated_ratio': round(self.gated / self.checked, 3) if self.checked else 0.0,
+                'last_change': round(self.last_change, 4)
+            }
@@ -0,0 +1,260 @@
+# multi_camera.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import *
+from face_detector import FaceDetector
+from database_handler import DatabaseHandler
+from camera_grabber import FrameGrabber, open_capture
+from pipeline import FrameProcessor, OutputStage, StageStats
+from metrics import MetricsExporter, get_registry
+from frame_scheduler import AdaptiveFrameScheduler
+from main import check_mysql_server, load_yolo_model
+
+
+class CameraStream:
+    """State satu kamera: grabber, tracker dan status masuk/keluar sendiri, lokasi untuk log"""
+
+    def __init__(self, lokasi, settings, detector, processor, ready_event=None):
+        self.lokasi = lokasi
+        self.settings = settings
+        self.detector = detector
+        self.processor = processor
+        self.skip_frames = max(1, settings['skip_frames'])
+        self.scheduler = AdaptiveFrameScheduler(settings.get('fps'), self.skip_frames)
+        self.grabber = FrameGrabber(open_capture(settings), settings, StageStats(f'capture:{lokasi}'), ready_event)
+        self.requested = False      # request ke grabber masih menunggu frame
+        self.last_frame_id = 0
+        self.frames_processed = 0
+        self.track_count = 0
+        self.event_count = 0
+
+
+class MultiCameraRunner:
+    """Menjalankan N kamera dalam satu proses tanpa tampilan (headless)
+
+    Tiap kamera punya thread capture sendiri. Model YOLO, model InsightFace,
+    galeri wajah dan ID konsisten dipakai bersama; deteksi YOLO dan embedding
+    wajah dari semua kamera diproses dalam satu batch per langkah.
+    """
+
+    def __init__(self, model, base_detector, cameras, db_handler=None):
+        self.model = model
+        self.executor = ThreadPoolExecutor(
+            max_workers=PERFORMANCE_SETTINGS.get('max_workers', 4),
+            thread_name_prefix='face-worker'
+        )
+        # Processor bersama untuk embedding batch lintas kamera (model dan galeri sama)
+        self.shared_processor = FrameProcessor(model, base_detector, self.executor)
+
+        # Di-set grabber mana pun yang mengirim frame, agar step() bisa menunggu kamera pertama yang siap
+        self.frame_ready = threading.Event()
+        self.streams = []
+        for camera in cameras:
+            detector = FaceDetector(shared=base_detector)
+            processor = FrameProcessor(model, detector, self.executor)
+            self.streams.append(CameraStream(camera['lokasi'], camera['settings'], detector, processor,
+                                             self.frame_ready))
+
+        self.output = OutputStage(db_handler)
+        self.stats = {
+            'inference': StageStats('inference'),
+            'output': self.output.stats
+        }
+        self.metrics = get_registry()
+        self.metrics_exporter = MetricsExporter(self.metrics)
+        self.steps = 0
+
+    def start(self):
+        for stream in self.streams:
+            stream.grabber.start()
+        self.output.start()
+        self.metrics.add_collector(self.snapshot)
+        self.metrics_exporter.start()
+
+    def stop(self):
+        for stream in self.streams:
+            stream.grabber.release()
+        self.output.stop()
+        self.metrics_exporter.stop()
+        self.metrics.remove_collector(self.snapshot)
+        self.executor.shutdown(wait=False)
+
+    def snapshot(self):
+        """Snapshot StageStats semua stage termasuk capture tiap kamera"""
+        stages = {name: stats.snapshot() for name, stats in self.stats.items()}
+        for stream in self.streams:
+            stages[stream.grabber.stats.name] = stream.grabber.stats.snapshot()
+        return stages
+
+    def collect_ready(self):
+        """Frame dari semua kamera yang sudah siap, tanpa menunggu; kamera yang reconnect dilewati"""
+        batch = []
+        for stream in self.streams:
+            if stream.grabber.reconnecting:
+                continue
+            if not stream.requested:
+                stream.grabber.request(stream.last_frame_id + stream.skip_frames)
+                stream.requested = True
+            frame, frame_id = stream.grabber.collect(timeout=0)
+            if frame is None:
+                continue
+            stream.requested = False
+            stream.last_frame_id = frame_id
+            batch.append((stream, stream.processor.prepare_frame(frame)))
+        return batch
+
+    def step(self):
+        """Satu langkah: proses frame dari kamera yang sudah siap sebagai satu batch
+
+        Kamera tidak berjalan lockstep: hanya jika belum ada kamera yang siap,
+        step menunggu (maksimal frame_wait) frame pertama dari kamera mana pun,
+        sehingga kamera yang lambat atau sedang reconnect tidak menahan yang lain.
+        """
+        deadline = time.time() + MULTI_CAMERA_SETTINGS.get('frame_wait', 0.5)
+        while True:
+            self.frame_ready.clear()
+            batch = self.collect_ready()
+            remaining = deadline - time.time()
+            if batch or remaining <= 0:
+                break
+            self.frame_ready.wait(remaining)
+
+        if not batch:
+            return 0
+
+        start = time.perf_counter()
+        current_time = time.time()
+        # YOLO hanya untuk kamera yang scene-nya berubah, sisanya memakai deteksi terakhir
+        to_detect = [(stream, frame) for stream, frame in batch
+                     if stream.processor.needs_detection(frame, current_time)]
+        if to_detect:
+            with self.metrics.timer('yolo'):
+                results = self.model([frame for _, frame in to_detect], verbose=False)
+            for (stream, frame), result in zip(to_detect, results):
+                stream.processor.last_detections = stream.processor.detections_from_result(result, frame)
+
+        # Tracker per kamera, crop yang perlu di-embed dikumpulkan lintas kamera
+        per_stream = []
+        all_crops = []
+        for stream, frame in batch:
+            detections = stream.processor.last_detections
+            with self.metrics.timer('tracker'):
+                tracks = stream.detector.tracker.update_tracks(detections, frame=frame)
+            resolved, pending = stream.processor.collect_faces(frame, tracks, current_time)
+            per_stream.append((stream, tracks, resolved, pending, len(all_crops)))
+            all_crops.extend(crop for _, _, crop in pending)
+
+        identified = self.shared_processor.identify_crops(all_crops)
+
+        for stream, tracks, resolved, pending, offset in per_stream:
+            faces = resolved + stream.processor.resolve_faces(
+                pending, identified[offset:offset + len(pending)], tracks, current_time
+            )
+            events = stream.processor.update_presence(faces, current_time)
+            for consistent_id, name, status in events:
+                stream.detector.event_log.append(consistent_id, name, status, current_time, stream.lokasi)
+                self.output.log_event(consistent_id, name, status, stream.lokasi)
+            stream.frames_processed += 1
+            stream.track_count = len(tracks)
+            stream.event_count = len(events)
+
+        latency = time.perf_counter() - start
+        self.stats['inference'].record(latency)
+        # Satu batch melayani semua kamera: latency batch dipakai untuk budget tiap kamera
+        for stream, _ in batch:
+            stream.skip_frames = stream.scheduler.update(
+                stream.processor.motion_gate.last_change, latency, stream.track_count, stream.event_count
+            )
+        self.steps += 1
+
+        if self.steps % APP_SETTINGS['stats_update_interval'] == 0:
+            for stream in self.streams:
+                stream.detector.prune_evicted_ids()
+            self.output.update_statistics(self.totals())
+        return len(batch)
+
+    def totals(self):
+        """Total masuk/keluar gabungan semua kamera untuk tabel statistics"""
+        detectors = [stream.detector for stream in self.streams]
+        return (
+            sum(d.total_masuk for d in detectors),
+            sum(d.total_keluar for d in detectors),
+            sum(d.wajah_di_dalam for d in detectors),
+            len(set().union(*(d.unique_faces_detected for d in detectors)))
+        )
+
+    def print_status(self):
+        print("\n=== STATUS MULTI KAMERA ===")
+        for stream in self.streams:
+            capture = stream.grabber.stats.snapshot()
+            print(f"{stream.lokasi:<20} frame={stream.frames_processed:<6} "
+                  f"masuk={stream.detector.total_masuk:<4} keluar={stream.detector.total_keluar:<4} "
+                  f"reconnect={stream.grabber.reconnects} grab={capture['latency_ms']:.1f}ms "
+                  f"skip={stream.skip_frames} yolo_skipped={stream.processor.motion_gate.snapshot()['gated']}")
+        for name, stats in self.stats.items():
+            snapshot = stats.snapshot()
+            print(f"{name:<20} queue={snapshot['queue_depth']:<3} latency={snapshot['latency_ms']:.1f}ms "
+                  f"processed={snapshot['processed']}")
+        writer = self.output.writer_snapshot()
+        if writer is not None:
+            print(f"{'db_writer':<20} queue={writer['queue_depth']:<3} flush={writer['flush_latency_ms']:.1f}ms "
+                  f"written={writer['written']} spilled={writer['spilled']} replayed={writer['replayed']}")
+
+    def run(self):
+        self.start()
+        last_status = time.time()
+        try:
+            while True:
+                try:
+                    self.step()
+                except Exception as step_error:
+                    print(f"[ERROR] Gagal memproses batch: {step_error}")
+
+                if time.time() - last_status >= MULTI_CAMERA_SETTINGS.get('status_interval', 10):
+                    self.print_status()
+                    last_status = time.time()
+        except KeyboardInterrupt:
+            print("\n[INFO] Menghentikan multi kamera...")
+        finally:
+            self.stop()
+            self.print_status()
+
+
+def main():
+    """Menjalankan semua kamera di MULTI_CAMERA_SETTINGS secara headless"""
+    print("\n🚀 MEMULAI FACE RECOGNITION - MULTI KAMERA")
+
+    print("\n1. 📁 Memuat dataset wajah...")
+    base_detector = FaceDetector()
+    known_faces, _ = base_detector.load_known_faces("dataset/original")
+    print(f"   ✅ {len(known_faces)} wajah berhasil dimuat")
+
+    print("\n2. 🗄️ Inisialisasi database...")
+    db_handler = None
+    if check_mysql_server():
+        handler = DatabaseHandler()
+        if handler.init_database():
+            db_handler = handler
+        else:
+            print("   ⚠️  Database tidak terhubung")
+
+    print("\n3. 🤖 Memuat model YOLO...")
+    model = load_yolo_model()
+    if model is None:
+        print("   ❌ Semua model gagal dimuat!")
+        return
+
+    cameras = MULTI_CAMERA_SETTINGS['cameras']
+    print(f"\n4. 🎥 Membuka {len(cameras)} kamera...")
+    runner = MultiCameraRunner(model, base_detector, cameras, db_handler)
+    print("   Tekan Ctrl+C untuk berhenti")
+    runner.run()
+
+    if db_handler is not None:
+        db_handler.update_statistics(*runner.totals())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+# pipeline.py
+import threading
+import queue
+import time
+import cv2
+from concurrent.futures import ThreadPoolExecutor
+
+from config import FACE_SETTINGS, PERFORMANCE_SETTINGS, APP_SETTINGS
+from log_writer import AsyncLogWriter
+from metrics import MetricsExporter, get_registry
+from frame_scheduler import AdaptiveFrameScheduler
+from motion_gate import MotionGate
+
+
+class StageStats:
+    """Statistik satu stage pipeline: throughput, latency, dan item yang dibuang"""
+
+    def __init__(self, name, stage_queue=None):
+        self.name = name
+        self.stage_queue = stage_queue
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.last_latency = 0.0
+        self.avg_latency = 0.0
+
+    def record(self, latency):
+        with self.lock:
+            self.processed += 1
+            self.last_latency = latency
+            # EMA agar nilai tetap stabil tanpa menyimpan histori
+            if self.processed == 1:
+                self.avg_latency = latency
+            else:
+                self.avg_latency = 0.9 * self.avg_latency + 0.1 * latency
+
+    def drop(self, count=1):
+        with self.lock:
+            self.dropped += count
+
+    def skip(self, count=1):
+        with self.lock:
+            self.skipped += count
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'queue_depth': self.stage_queue.qsize() if self.stage_queue is not None else 0,
+                'processed': self.processed,
+                'dropped': self.dropped,
+                'skipped': self.skipped,
+                'latency_ms': round(self.avg_latency * 1000, 2),
+                'last_latency_ms': round(self.last_latency * 1000, 2)
+            }
+
+
+def put_latest(stage_queue, item, stats=None):
+    """Memasukkan item ke queue terbatas, membuang item tertua jika penuh"""
+    while True:
+        try:
+            stage_queue.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                stage_queue.get_nowait()
+                if stats is not None:
+                    stats.drop()
+            except queue.Empty:
+                pass
+
+
+class OutputStage:
+    """Stage output: mencetak event masuk/keluar dan meneruskannya ke AsyncLogWriter
+
+    Penulisan ke database (batch log dan update statistik) dikerjakan thread
+    AsyncLogWriter, sehingga log_event() tidak pernah menahan inference.
+    Tanpa database, event hanya dicetak ke konsol.
+    """
+
+    def __init__(self, db_handler=None, writer_settings=None):
+        self.db_handler = db_handler
+        self.writer = None
+        if db_handler is not None:
+            self.writer = AsyncLogWriter(db_handler, writer_settings)
+            self.stats = StageStats('output', self.writer.queue)
+            self.writer.stats = self.stats
+        else:
+            self.stats = StageStats('output')
+
+    def start(self):
+        if self.writer is not None:
+            self.writer.start()
+
+    def stop(self):
+        """Berhenti setelah semua log di-flush ke database atau file spill"""
+        if self.writer is not None:
+            self.writer.stop()
+
+    def log_event(self, consistent_id, name, status, lokasi=None):
+        where = f" | {lokasi}" if lokasi else ""
+        print(f"[LOG] ID:{consistent_id} | {name} | {status.upper()}{where}")
+        if self.writer is not None:
+            self.writer.submit(consistent_id, name, status, lokasi)
+
+    def update_statistics(self, statistics):
+        # Statistik boleh dilewati jika queue penuh, update berikutnya akan menyusul
+        if self.writer is not None:
+            self.writer.submit_statistics(statistics)
+
+    def writer_snapshot(self):
+        return self.writer.snapshot() if self.writer is not None else None
+
+
+class FrameProcessor:
+    """Logika per frame: YOLO -> DeepSort -> InsightFace -> event masuk/keluar"""
+
+    def __init__(self, model, face_detector, executor=None):
+        self.model = model
+        self.face_detector = face_detector
+        self.executor = executor
+        self.metrics = get_registry()
+        self.motion_gate = MotionGate()
+        self.last_detections = []
+
+    def needs_detection(self, frame, now=None):
+        """False jika scene tidak berubah sejak deteksi terakhir (YOLO boleh dilewati)
+
+        now: waktu frame (detik) untuk refresh_interval gate; replay memakai waktu video.
+        """
+        with self.metrics.timer('motion_gate'):
+            return self.motion_gate.should_detect(frame, now)
+
+    def detect(self, frame, now=None):
+        """Deteksi YOLO, mengembalikan list deteksi format DeepSort
+
+        Jika motion gate menilai scene tidak berubah, deteksi terakhir dipakai
+        ulang: tracker tetap di-update tiap frame sehingga track dan
+        face_last_seen berjalan normal, dan track menua seperti biasa saat
+        scene kosong.
+        """
+        if not self.needs_detection(frame, now):
+            return self.last_detections
+        with self.metrics.timer('yolo'):
+            results = self.model(frame, verbose=False)[0]
+        self.last_detections = self.detections_from_result(results, frame)
+        return self.last_detections
+
+    def detections_from_result(self, results, frame):
+        """Konversi hasil YOLO satu frame ke list deteksi format DeepSort"""
+        detections = []
+
+        for box in results.boxes:
+            x1, y1, x2, y2 = map(int, box.xyxy[0])
+            conf = box.conf[0].item()
+            cls_id = int(box.cls[0])
+            class_name = results.names[cls_id]
+
+            if conf < 0.5:
+                continue
+
+            # Expand bounding box
+            x1, y1, x2, y2 = self.face_detector.expand_bbox(x1, y1, x2, y2, frame.shape)
+
+            bbox = [x1, y1, x2-x1, y2-y1]
+            detections.append((bbox, conf, class_name))
+
+        return detections
+
+    def collect_faces(self, frame, tracks, current_time):
+        """Memisahkan track terkonfirmasi menjadi yang identitasnya dari cache dan yang perlu di-embed
+
+        Mengembalikan (resolved, pending): resolved berisi (bbox, consistent_id, name, similarity),
+        pending berisi (track_id, bbox, rgb_crop).
+        """
+        resolved_faces = []
+        pending_faces = []
+        for track in tracks:
+            if not track.is_confirmed():
+                continue
+
+            track_id = track.track_id
+            ltrb = track.to_ltrb()
+            x1, y1, x2, y2 = map(int, ltrb)
+
+            # Pastikan bounding box dalam frame
+            x1 = max(0, x1)
+            y1 = max(0, y1)
+            x2 = min(frame.shape[1], x2)
+            y2 = min(frame.shape[0], y2)
+
+            # Ambil crop wajah
+            face_crop = frame[y1:y2, x1:x2]
+            if face_crop.size == 0:
+                continue
+
+            bbox = (x1, y1, x2, y2)
+            cached = self.face_detector.get_cached_track_identity(track_id, bbox, current_time)
+            if cached is not None:
+                resolved_faces.append((bbox, cached['consistent_id'], cached['name'], cached['similarity']))
+                continue
+
+            pending_faces.append((track_id, bbox, cv2.cvtColor(face_crop, cv2.COLOR_BGR2RGB)))
+
+        return resolved_faces, pending_faces
+
+    def identify_crops(self, crops):
+        """Embedding (satu batch recognition) lalu pencocokan galeri untuk list crop RGB
+
+        Mengembalikan list (embedding, name, similarity) sejajar dengan crops;
+        elemen None jika wajah tidak ditemukan pada crop.
+        """
+        if not crops:
+            return []
+        try:
+            with self.metrics.timer('insightface'):
+                embeddings = self.face_detector.embed_face_crops(crops, executor=self.executor)
+        except Exception as face_error:
+            print(f"[ERROR] InsightFace gagal: {face_error}")
+            return [None] * len(crops)
+
+        found = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+        identities = []
+        if found:
+            # Cocokkan semua wajah ke galeri dalam satu batch
+            with self.metrics.timer('matching'):
+                identities = self.face_detector.recognize_identities(
+                    [embeddings[i] for i in found], FACE_SETTINGS['threshold']
+                )
+
+        results = [None] * len(crops)
+        for i, (name, similarity) in zip(found, identities):
+            results[i] = (embeddings[i], name, similarity)
+        return results
+
+    def resolve_faces(self, pending_faces, identified, tracks, current_time):
+        """Memberi ID konsisten untuk wajah yang baru diidentifikasi dan memperbarui cache track"""
+        face_detector = self.face_detector
+        resolved_faces = []
+
+        for (track_id, bbox, _), identity in zip(pending_faces, identified):
+            if identity is None:
+                continue
+            embedding, name, similarity = identity
+            consistent_id = face_detector.get_consistent_face_id(embedding, now=current_time)
+            face_detector.cache_track_identity(track_id, bbox, consistent_id, name, similarity, current_time)
+            resolved_faces.append((bbox, consistent_id, name, similarity))
+
+        face_detector.prune_track_cache({track.track_id for track in tracks})
+        return resolved_faces
+
+    def recognize(self, frame, tracks, current_time):
+        """Identifikasi semua track terkonfirmasi, mengembalikan list (bbox, consistent_id, name, similarity)"""
+        resolved_faces, pending_faces = self.collect_faces(frame, tracks, current_time)
+        identified = self.identify_crops([crop for _, _, crop in pending_faces])
+        return resolved_faces + self.resolve_faces(pending_faces, identified, tracks, current_time)
+
+    def update_presence(self, faces, current_time):
+        """Memperbarui status masuk/keluar, mengembalikan list event (consistent_id, name, status)"""
+        face_detector = self.face_detector
+        events = []
+        current_frame_faces = set()
+
+        for _, consistent_id, name, _ in faces:
+            current_frame_faces.add(consistent_id)
+
+            if consistent_id not in face_detector.face_status:
+                face_detector.face_status[consistent_id] = "masuk"
+                face_detector.face_last_seen[consistent_id] = current_time
+
+                face_detector.total_masuk += 1
+                face_detector.wajah_di_dalam += 1
+                face_detector.unique_faces_detected.add(consistent_id)
+                events.append((consistent_id, name, "masuk"))
+            else:
+                face_detector.face_last_seen[consistent_id] = current_time
+
+            if consistent_id not in face_detector.face_counter:
+                face_detector.face_counter[consistent_id] = name
+
+        # Periksa wajah yang keluar
+        for consistent_id in list(face_detector.face_last_seen.keys()):
+            if consistent_id not in current_frame_faces:
+                if (current_time - face_detector.face_last_seen[consistent_id] > FACE_SETTINGS['track_timeout'] and
+                    face_detector.face_status.get(consistent_id) == "masuk"):
+                    face_detector.face_status[consistent_id] = "keluar"
+                    name = face_detector.face_counter.get(consistent_id, "Tidak Dikenali")
+
+                    face_detector.total_keluar += 1
+                    face_detector.wajah_di_dalam = max(0, face_detector.wajah_di_dalam - 1)
+                    events.append((consistent_id, name, "keluar"))
+
+        return events
+
+    def prepare_frame(self, frame):
+        """Resize frame untuk performa"""
+        if frame.shape[1] > 640:
+            frame = cv2.resize(frame, (640, 480))
+        return frame
+
+    def build_result(self, frame, faces, events, tracks):
+        """Dict hasil untuk stage render/output"""
+        names = set(self.face_detector.face_counter.values())
+        return {
+            'frame': frame,
+            'faces': faces,
+            'events': events,
+            'track_count': len(tracks),
+            'known_count': len(names) - (1 if "Tidak Dikenali" in names else 0)
+        }
+
+    def process(self, frame):
+        """Memproses satu frame, mengembalikan dict hasil untuk stage render/output"""
+        frame = self.prepare_frame(frame)
+
+        current_time = time.time()
+        detections = self.detect(frame, current_time)
+        with self.metrics.timer('tracker'):
+            tracks = self.face_detector.tracker.update_tracks(detections, frame=frame)
+
+        faces = self.recognize(frame, tracks, current_time)
+        events = self.update_presence(faces, current_time)
+        return self.build_result(frame, faces, events, tracks)
+
+
+class FacePipeline:
+    """Pipeline bertingkat: capture -> deteksi/recognition -> output (DB) dan render
+
+    Capture (FrameGrabber) hanya men-decode frame terbaru saat diminta, sehingga
+    stage yang lambat tidak membuat buffer kamera menumpuk. Tiap stage punya
+    StageStats sendiri.
+    """
+
+    def __init__(self, grabber, model, face_detector, db_handler=None, skip_frames=1, lokasi=None):
+        self.grabber = grabber
+        self.face_detector = face_detector
+        self.skip_frames = max(1, skip_frames)
+        self.scheduler = AdaptiveFrameScheduler(grabber.settings.get('fps'), self.skip_frames)
+        self.lokasi = lokasi or APP_SETTINGS['camera_name']
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=PERFORMANCE_SETTINGS.get('max_workers', 4),
+            thread_name_prefix='face-worker'
+        )
+        self.processor = FrameProcessor(model, face_detector, self.executor)
+
+        self.render_queue = queue.Queue(maxsize=2)
+        self.output = OutputStage(db_handler)
+
+        self.stats = {
+            'capture': StageStats('capture'),
+            'inference': StageStats('inference'),
+            'output': self.output.stats,
+            'render': StageStats('render', self.render_queue)
+        }
+        self.grabber.stats = self.stats['capture']
+        self.metrics_exporter = MetricsExporter()
+
+        self.stop_event = threading.Event()
+        self.paused = False
+        self.reset_requested = False
+        self.threads = []
+
+    @property
+    def frames_captured(self):
+        return self.grabber.frame_id
+
+    def start(self):
+        self.grabber.start()
+        self.output.start()
+        get_registry().add_collector(self.snapshot)
+        self.metrics_exporter.start()
+        self.threads = [
+            threading.Thread(target=self._inference_loop, name='inference', daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.grabber.release()
+        for thread in self.threads:
+            thread.join(timeout=5)
+        self.output.stop()
+        self.metrics_exporter.stop()
+        get_registry().remove_collector(self.snapshot)
+        self.executor.shutdown(wait=False)
+
+    def request_reset(self):
+        """Reset counting dilakukan oleh thread inference agar tidak balapan dengan update"""
+        self.reset_requested = True
+
+    def get_result(self, timeout=0.05):
+        """Mengambil hasil frame terbaru untuk dirender (dipanggil dari main thread)"""
+        try:
+            return self.render_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def snapshot(self):
+        """Queue depth dan latency semua stage"""
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+    def _next_frame(self, last_frame_id):
+        """Meminta frame terbaru minimal skip_frames setelah frame terakhir yang diproses"""
+        while not self.stop_event.is_set():
+            if self.paused:
+                time.sleep(0.05)
+                continue
+
+            skip_frames = self.skip_frames
+            frame, frame_id = self.grabber.read(last_frame_id + skip_frames, timeout=0.5)
+            if frame is None:
+                continue
+
+            # Frame di antaranya tidak diproses: sebagian karena skip_frames,
+            # sisanya dibuang grabber karena inference lebih lambat dari kamera
+            if last_frame_id:
+                gap = frame_id - last_frame_id - 1
+                skipped = min(gap, skip_frames - 1)
+                self.stats['capture'].skip(skipped)
+                self.stats['capture'].drop(gap - skipped)
+            return frame, frame_id
+        return None, last_frame_id
+
+    def _inference_loop(self):
+        stats = self.stats['inference']
+        last_frame_id = 0
+        processed = 0
+
+        while not self.stop_event.is_set():
+            frame, last_frame_id = self._next_frame(last_frame_id)
+            if frame is None:
+                break
+
+            if self.reset_requested:
+                self.face_detector.total_masuk = 0
+                self.face_detector.total_keluar = 0
+                self.face_detector.wajah_di_dalam = 0
+                self.face_detector.unique_faces_detected = set()
+                self.face_detector.event_log.clear()
+                self.reset_requested = False
+                print("[INFO] Counting telah direset")
+
+            start = time.perf_counter()
+            try:
+                result = self.processor.process(frame)
+            except Exception as yolo_error:
+                print(f"[ERROR] Gagal memproses frame: {yolo_error}")
+                continue
+            latency = time.perf_counter() - start
+            stats.record(latency)
+            processed += 1
+            self.skip_frames = self.scheduler.update(
+                self.processor.motion_gate.last_change, latency, result['track_count'], len(result['events'])
+            )
+
+            for consistent_id, name, status in result['events']:
+                self.face_detector.event_log.append(consistent_id, name, status, lokasi=self.lokasi)
+                self.output.log_event(consistent_id, name, status, self.lokasi)
+
+            # Update statistics secara periodic
+            if processed % APP_SETTINGS['stats_update_interval'] == 0:
+                self.output.update_statistics(self._statistics())
+
+            put_latest(self.render_queue, result, self.stats['render'])
+
+    def _statistics(self):
+        face_detector = self.face_detector
+        return (
+            face_detector.total_masuk,
+            face_detector.total_keluar,
+            face_detector.wajah_di_dalam,
+            len(face_detector.unique_faces_detected)
+        )
@@ -0,0 +1,83 @@
+# response_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from config import WEB_SETTINGS
+
+
+class ResponseCache:
+    """Cache response API di memori: TTL, batas jumlah entry (LRU) dan versi data
+
+    Entry hanya dipakai jika versi datanya sama dengan versi terbaru dari tabel
+    data_version, sehingga log baru dari recognizer langsung membatalkan cache
+    tanpa perlu menunggu TTL.
+    """
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = WEB_SETTINGS['cache_ttl'] if ttl is None else ttl
+        self.max_entries = WEB_SETTINGS['cache_max_entries'] if max_entries is None else max_entries
+        self.entries = OrderedDict()    # key -> (version, expires, body, etag)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        """Mengembalikan (body, etag) yang masih valid untuk versi ini, atau None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version or entry[1] < time.time():
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2], entry[3]
+
+    def put(self, key, version, body):
+        """Menyimpan body response, mengembalikan ETag-nya"""
+        etag = f'"{version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+        with self.lock:
+            self.entries[key] = (version, time.time() + self.ttl, body, etag)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return etag
+
+    def snapshot(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 3) if total else 0.0
+            }
+
+
+class DataVersion:
+    """Versi data terbaru dari tabel data_version, dibaca paling sering sekali per interval
+
+    Berapapun jumlah viewer dashboard, database hanya menerima satu query
+    primary-key per interval untuk mengecek apakah ada data baru.
+    """
+
+    def __init__(self, fetch_version, interval=None):
+        self.fetch_version = fetch_version
+        self.interval = WEB_SETTINGS['version_check_interval'] if interval is None else interval
+        self.lock = threading.Lock()
+        self.version = None
+        self.checked_at = 0.0
+
+    def current(self):
+        with self.lock:
+            if self.version is not None and time.time() - self.checked_at < self.interval:
+                return self.version
+            try:
+                self.version = self.fetch_version()
+            except Exception as e:
+                # Tanpa versi terbaru, cache hanya mengandalkan TTL
+                print(f"[CACHE] Gagal membaca versi data: {e}")
+                self.version = self.version if self.version is not None else 0
+            self.checked_at = time.time()
+            return self.version
@@ -0,0 +1,195 @@
+# rollups.py
+"""Tabel rollup (harian, per jam, per orang) untuk halaman statistik
+
+Rollup diperbarui di transaksi yang sama dengan INSERT ke tabel logs, sehingga
+route web cukup membaca beberapa baris kecil dan tidak memindai tabel logs.
+Jalankan `python rollups.py backfill` untuk membangun ulang dari logs lama.
+"""
+import sys
+from collections import Counter, defaultdict
+
+import mysql.connector
+
+from config import DB_CONFIG
+from face_gallery import UNKNOWN_LABEL
+
+
+ROLLUP_TABLES = {
+    'rollup_daily': """
+        CREATE TABLE IF NOT EXISTS rollup_daily (
+            tanggal DATE PRIMARY KEY,
+            total INT NOT NULL DEFAULT 0,
+            masuk INT NOT NULL DEFAULT 0,
+            keluar INT NOT NULL DEFAULT 0
+        )
+    """,
+    'rollup_hourly': """
+        CREATE TABLE IF NOT EXISTS rollup_hourly (
+            tanggal DATE NOT NULL,
+            jam TINYINT NOT NULL,
+            total INT NOT NULL DEFAULT 0,
+            masuk INT NOT NULL DEFAULT 0,
+            keluar INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (tanggal, jam)
+        )
+    """,
+    'rollup_person': """
+        CREATE TABLE IF NOT EXISTS rollup_person (
+            nim_nama VARCHAR(255) PRIMARY KEY,
+            total INT NOT NULL DEFAULT 0,
+            masuk INT NOT NULL DEFAULT 0,
+            keluar INT NOT NULL DEFAULT 0,
+            last_seen DATETIME DEFAULT NULL,
+            INDEX idx_total (total)
+        )
+    """,
+    # Pasangan (tanggal, consistent_id) unik untuk menghitung wajah unik per hari
+    'rollup_daily_faces': """
+        CREATE TABLE IF NOT EXISTS rollup_daily_faces (
+            tanggal DATE NOT NULL,
+            consistent_id VARCHAR(255) NOT NULL,
+            PRIMARY KEY (tanggal, consistent_id)
+        )
+    """
+}
+
+
+def create_rollup_tables(cursor):
+    for ddl in ROLLUP_TABLES.values():
+        cursor.execute(ddl)
+
+
+def update_rollups(cursor, rows):
+    """Menambahkan event ke rollup; dipanggil di transaksi yang sama dengan INSERT logs
+
+    rows: list (consistent_id, nim_nama, status_masuk_keluar, waktu).
+    Event dijumlahkan dulu di Python sehingga satu batch log hanya butuh
+    satu upsert per hari/jam/orang.
+    """
+    daily = defaultdict(Counter)
+    hourly = defaultdict(Counter)
+    person = defaultdict(Counter)
+    last_seen = {}
+    faces = set()
+
+    for consistent_id, name, status, waktu in rows:
+        tanggal = waktu.date()
+        masuk = int(status == 'masuk')
+        keluar = int(status == 'keluar')
+        for counter in (daily[tanggal], hourly[(tanggal, waktu.hour)], person[name]):
+            counter.update(total=1, masuk=masuk, keluar=keluar)
+        last_seen[name] = max(waktu, last_seen.get(name, waktu))
+        if consistent_id is not None:
+            faces.add((tanggal, str(consistent_id)))
+
+    cursor.executemany("""
+        INSERT INTO rollup_daily (tanggal, total, masuk, keluar) VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE total = total + VALUES(total), masuk = masuk + VALUES(masuk),
+                                keluar = keluar + VALUES(keluar)
+    """, [(tanggal, c['total'], c['masuk'], c['keluar']) for tanggal, c in daily.items()])
+    cursor.executemany("""
+        INSERT INTO rollup_hourly (tanggal, jam, total, masuk, keluar) VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE total = total + VALUES(total), masuk = masuk + VALUES(masuk),
+                                keluar = keluar + VALUES(keluar)
+    """, [(tanggal, jam, c['total'], c['masuk'], c['keluar']) for (tanggal, jam), c in hourly.items()])
+    cursor.executemany("""
+        INSERT INTO rollup_person (nim_nama, total, masuk, keluar, last_seen) VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE total = total + VALUES(total), masuk = masuk + VALUES(masuk),
+                                keluar = keluar + VALUES(keluar), last_seen = GREATEST(last_seen, VALUES(last_seen))
+    """, [(name, c['total'], c['masuk'], c['keluar'], last_seen[name]) for name, c in person.items()])
+    if faces:
+        cursor.executemany(
+            "INSERT IGNORE INTO rollup_daily_faces (tanggal, consistent_id) VALUES (%s, %s)",
+            sorted(faces)
+        )
+
+
+def fetch_today_stats(cursor, today):
+    """Total/masuk/keluar hari ini dari rollup_daily (dict dengan nilai 0 jika belum ada event)"""
+    cursor.execute("SELECT total, masuk, keluar FROM rollup_daily WHERE tanggal = %s", (today,))
+    row = cursor.fetchone()
+    if row is None:
+        return {'total': 0, 'masuk': 0, 'keluar': 0}
+    return row
+
+
+def fetch_unique_faces(cursor, today):
+    cursor.execute("SELECT COUNT(*) AS unique_faces_today FROM rollup_daily_faces WHERE tanggal = %s", (today,))
+    return cursor.fetchone()
+
+
+def fetch_top_persons(cursor, limit=10):
+    cursor.execute("""
+        SELECT nim_nama, total AS activity_count, masuk AS masuk_count, keluar AS keluar_count
+        FROM rollup_person
+        WHERE nim_nama != %s
+        ORDER BY total DESC
+        LIMIT %s
+    """, (UNKNOWN_LABEL, limit))
+    return cursor.fetchall()
+
+
+def fetch_hour_counts(cursor, today):
+    """List 24 angka jumlah event per jam untuk tanggal tertentu"""
+    cursor.execute("SELECT jam, total FROM rollup_hourly WHERE tanggal = %s", (today,))
+    hour_counts = [0] * 24
+    for row in cursor.fetchall():
+        if 0 <= row['jam'] < 24:
+            hour_counts[row['jam']] = row['total']
+    return hour_counts
+
+
+def backfill_rollups(conn):
+    """Membangun ulang semua rollup dari tabel logs (jalankan saat recognizer tidak menulis log)"""
+    cursor = conn.cursor()
+    create_rollup_tables(cursor)
+
+    conn.start_transaction()
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+
+    cursor.execute("""
+        INSERT INTO rollup_daily (tanggal, total, masuk, keluar)
+        SELECT DATE(waktu), COUNT(*),
+               SUM(status_masuk_keluar = 'masuk'), SUM(status_masuk_keluar = 'keluar')
+        FROM logs GROUP BY DATE(waktu)
+    """)
+    cursor.execute("""
+        INSERT INTO rollup_hourly (tanggal, jam, total, masuk, keluar)
+        SELECT DATE(waktu), HOUR(waktu), COUNT(*),
+               SUM(status_masuk_keluar = 'masuk'), SUM(status_masuk_keluar = 'keluar')
+        FROM logs GROUP BY DATE(waktu), HOUR(waktu)
+    """)
+    cursor.execute("""
+        INSERT INTO rollup_person (nim_nama, total, masuk, keluar, last_seen)
+        SELECT nim_nama, COUNT(*),
+               SUM(status_masuk_keluar = 'masuk'), SUM(status_masuk_keluar = 'keluar'), MAX(waktu)
+        FROM logs WHERE nim_nama IS NOT NULL GROUP BY nim_nama
+    """)
+    cursor.execute("""
+        INSERT INTO rollup_daily_faces (tanggal, consistent_id)
+        SELECT DISTINCT DATE(waktu), consistent_id
+        FROM logs WHERE consistent_id IS NOT NULL
+    """)
+    conn.commit()
+
+    cursor.execute("SELECT COUNT(*) FROM rollup_daily")
+    days = cursor.fetchone()[0]
+    cursor.close()
+    return days
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != 'backfill':
+        print("Penggunaan: python rollups.py backfill")
+        sys.exit(1)
+
+    print("🔧 Membangun ulang rollup dari tabel logs...")
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        days = backfill_rollups(conn)
+        conn.close()
+        print(f"✅ Rollup selesai: {days} hari")
+    except mysql.connector.Error as e:
+        print(f"❌ Error backfill rollup: {e}")
+        sys.exit(1)
@@ -0,0 +1,37 @@
+# test_pipeline.py
+import threading
+
+from pipeline import OutputStage
+
+
+class StubDbHandler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = []
+        self.statistics = []
+
+    def save_logs_batch(self, rows):
+        with self.lock:
+            self.rows.extend(rows)
+        return True
+
+    def update_statistics(self, *statistics):
+        with self.lock:
+            self.statistics.append(statistics)
+        return True
+
+
+def test_output_stage_writes_through_async_writer(tmp_path, monkeypatch):
+    # File spill default (relatif) dibuat di folder sementara
+    monkeypatch.chdir(tmp_path)
+    db_handler = StubDbHandler()
+    output = OutputStage(db_handler)
+    output.start()
+    output.log_event(1, 'Mahasiswa', 'masuk', 'Webcam')
+    output.update_statistics((1, 0, 1, 1))
+    output.stop()
+
+    assert [row[:3] for row in db_handler.rows] == [(1, 'Mahasiswa', 'masuk')]
+    assert db_handler.rows[0][4] == 'Webcam'
+    assert db_handler.statistics == [(1, 0, 1, 1)]
+    assert output.writer_snapshot()['written'] == 1
@@ -0,0 +1,3 @@
+# wsgi.py
+# Entry point production: gunicorn -c gunicorn.conf.py wsgi:app
+from app import app